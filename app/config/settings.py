@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Literal
+from typing import Literal, Tuple
 
 from dotenv import load_dotenv
 
@@ -18,11 +18,91 @@ class Settings:
     newsdata_api_key: str
     gemini_model: str
     max_output_tokens: int
-    stream_delay_seconds: float
     context_message_limit: int
     news_fetch_limit: int
     use_advanced_pipeline: bool
     use_sqlite: bool
+    news_cache_size: int
+    news_cache_ttl_seconds: float
+    news_cache_stale_ttl_seconds: float
+    news_refresh_workers: int
+    news_singleflight_timeout_seconds: float
+    news_prefetch_enabled: bool
+    news_prefetch_interval_seconds: float
+    news_prefetch_seeds: Tuple[str, ...]
+    news_prefetch_top_n: int
+    news_prefetch_window_seconds: float
+    news_prefetch_countries: Tuple[str, ...]
+    news_background_reserve_fraction: float
+    news_watch_interval_seconds: float
+    news_watch_max_interval_seconds: float
+    news_watch_idle_seconds: float
+    news_watch_max_batch: int
+    news_planner_enabled: bool
+    news_planner_max_subqueries: int
+    news_planner_deadline_seconds: float
+    llm_cache_enabled: bool
+    llm_cache_size: int
+    llm_cache_ttl_seconds: float
+    llm_cache_db_path: str
+    llm_cache_nonzero_temperature: bool
+    gemini_max_concurrency: int
+    gemini_deadline_seconds: float
+    gemini_unavailable_ttl_seconds: float
+    gemini_failure_threshold: int
+    gemini_cooldown_seconds: float
+    gemini_api_keys: Tuple[str, ...]
+    gemini_key_rpm: float
+    gemini_key_cooldown_seconds: float
+    model_router_enabled: bool
+    gemini_light_model: str
+    gemini_light_max_output_tokens: int
+    model_router_heavy_threshold: int
+    model_router_many_articles: int
+    model_router_long_history: int
+    rank_freshness_half_life_hours: float
+    rank_freshness_weight: float
+    summary_memory_enabled: bool
+    prompt_token_budget: int
+    prompt_token_counter: Literal["heuristic", "gemini"]
+    news_fanout_mode: Literal["off", "first", "merge"]
+    news_fanout_deadline_seconds: float
+    news_fanout_workers: int
+    http_connect_timeout_seconds: float
+    http_read_timeout_seconds: float
+    http_pool_maxsize: int
+    news_retry_attempts: int
+    news_retry_budget_seconds: float
+    news_retry_base_delay_seconds: float
+    news_dedup_enabled: bool
+    news_dedup_min_similarity: float
+    news_dedup_overfetch: int
+    article_store_enabled: bool
+    article_store_min_score: float
+    article_store_min_relative_score: float
+    article_store_max_age_hours: float
+    article_store_max_articles: int
+    rate_limit_db_path: str
+    gnews_daily_limit: int
+    gnews_minute_limit: int
+    newsapi_daily_limit: int
+    newsapi_minute_limit: int
+    newsdata_daily_limit: int
+    newsdata_minute_limit: int
+    provider_ewma_alpha: float
+    provider_failure_threshold: int
+    provider_cooldown_seconds: float
+    provider_health_half_life_seconds: float
+    provider_explore_rate: float
+
+
+def _fanout_mode(value: str) -> str:
+    mode = value.strip().lower()
+    return mode if mode in ("off", "first", "merge") else "off"
+
+
+def _csv(value: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in value.split(",") if item.strip())
 
 
 def get_settings() -> Settings:
@@ -35,9 +115,81 @@ def get_settings() -> Settings:
         newsdata_api_key=os.getenv("NEWSDATA_API_KEY", "").strip(),
         gemini_model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash-lite").strip(),
         max_output_tokens=int(os.getenv("MAX_OUTPUT_TOKENS", "1500")),
-        stream_delay_seconds=float(os.getenv("STREAM_DELAY_SECONDS", "0.02")),
         context_message_limit=int(os.getenv("CONTEXT_MESSAGE_LIMIT", "5")),
         news_fetch_limit=int(os.getenv("NEWS_FETCH_LIMIT", "5")),
         use_advanced_pipeline=os.getenv("USE_ADVANCED_PIPELINE", "false").strip().lower() == "true",
         use_sqlite=os.getenv("USE_SQLITE", "false").strip().lower() == "true",
+        news_cache_size=int(os.getenv("NEWS_CACHE_SIZE", "100")),
+        news_cache_ttl_seconds=float(os.getenv("NEWS_CACHE_TTL_SECONDS", "900")),
+        news_cache_stale_ttl_seconds=float(os.getenv("NEWS_CACHE_STALE_TTL_SECONDS", "3600")),
+        news_refresh_workers=int(os.getenv("NEWS_REFRESH_WORKERS", "2")),
+        news_singleflight_timeout_seconds=float(os.getenv("NEWS_SINGLEFLIGHT_TIMEOUT_SECONDS", "15")),
+        news_prefetch_enabled=os.getenv("NEWS_PREFETCH_ENABLED", "false").strip().lower() == "true",
+        news_prefetch_interval_seconds=float(os.getenv("NEWS_PREFETCH_INTERVAL_SECONDS", "600")),
+        news_prefetch_seeds=_csv(os.getenv("NEWS_PREFETCH_SEEDS", "")),
+        news_prefetch_top_n=int(os.getenv("NEWS_PREFETCH_TOP_N", "5")),
+        news_prefetch_window_seconds=float(os.getenv("NEWS_PREFETCH_WINDOW_SECONDS", "3600")),
+        news_prefetch_countries=_csv(os.getenv("NEWS_PREFETCH_COUNTRIES", "in")),
+        news_background_reserve_fraction=float(os.getenv("NEWS_BACKGROUND_RESERVE_FRACTION", "0.3")),
+        news_watch_interval_seconds=float(os.getenv("NEWS_WATCH_INTERVAL_SECONDS", "60")),
+        news_watch_max_interval_seconds=float(os.getenv("NEWS_WATCH_MAX_INTERVAL_SECONDS", "600")),
+        news_watch_idle_seconds=float(os.getenv("NEWS_WATCH_IDLE_SECONDS", "300")),
+        news_watch_max_batch=int(os.getenv("NEWS_WATCH_MAX_BATCH", "10")),
+        news_planner_enabled=os.getenv("NEWS_PLANNER_ENABLED", "true").strip().lower() == "true",
+        news_planner_max_subqueries=int(os.getenv("NEWS_PLANNER_MAX_SUBQUERIES", "4")),
+        news_planner_deadline_seconds=float(os.getenv("NEWS_PLANNER_DEADLINE_SECONDS", "10")),
+        llm_cache_enabled=os.getenv("LLM_CACHE_ENABLED", "true").strip().lower() == "true",
+        llm_cache_size=int(os.getenv("LLM_CACHE_SIZE", "256")),
+        llm_cache_ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "900")),
+        llm_cache_db_path=os.getenv("LLM_CACHE_DB_PATH", "").strip(),
+        llm_cache_nonzero_temperature=os.getenv("LLM_CACHE_NONZERO_TEMPERATURE", "false").strip().lower() == "true",
+        gemini_max_concurrency=max(1, int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))),
+        gemini_deadline_seconds=float(os.getenv("GEMINI_DEADLINE_SECONDS", "20")),
+        gemini_unavailable_ttl_seconds=float(os.getenv("GEMINI_UNAVAILABLE_TTL_SECONDS", "3600")),
+        gemini_failure_threshold=int(os.getenv("GEMINI_FAILURE_THRESHOLD", "3")),
+        gemini_cooldown_seconds=float(os.getenv("GEMINI_COOLDOWN_SECONDS", "60")),
+        gemini_api_keys=_csv(os.getenv("GOOGLE_API_KEYS", "")),
+        gemini_key_rpm=max(1.0, float(os.getenv("GEMINI_KEY_RPM", "15"))),
+        gemini_key_cooldown_seconds=float(os.getenv("GEMINI_KEY_COOLDOWN_SECONDS", "60")),
+        model_router_enabled=os.getenv("MODEL_ROUTER_ENABLED", "true").strip().lower() == "true",
+        gemini_light_model=os.getenv("GEMINI_LIGHT_MODEL", "gemini-2.0-flash-lite").strip(),
+        gemini_light_max_output_tokens=int(os.getenv("GEMINI_LIGHT_MAX_OUTPUT_TOKENS", "500")),
+        model_router_heavy_threshold=int(os.getenv("MODEL_ROUTER_HEAVY_THRESHOLD", "2")),
+        # Defaults are the real caps: a full article set / a full history window
+        model_router_many_articles=int(os.getenv("MODEL_ROUTER_MANY_ARTICLES", os.getenv("NEWS_FETCH_LIMIT", "5"))),
+        model_router_long_history=int(os.getenv("MODEL_ROUTER_LONG_HISTORY", os.getenv("CONTEXT_MESSAGE_LIMIT", "5"))),
+        rank_freshness_half_life_hours=float(os.getenv("RANK_FRESHNESS_HALF_LIFE_HOURS", "12")),
+        rank_freshness_weight=float(os.getenv("RANK_FRESHNESS_WEIGHT", "0.3")),
+        summary_memory_enabled=os.getenv("SUMMARY_MEMORY_ENABLED", "true").strip().lower() == "true",
+        prompt_token_budget=int(os.getenv("PROMPT_TOKEN_BUDGET", "6000")),
+        prompt_token_counter="gemini" if os.getenv("PROMPT_TOKEN_COUNTER", "heuristic").strip().lower() == "gemini" else "heuristic",
+        news_fanout_mode=_fanout_mode(os.getenv("NEWS_FANOUT_MODE", "off")),
+        news_fanout_deadline_seconds=float(os.getenv("NEWS_FANOUT_DEADLINE_SECONDS", "8")),
+        news_fanout_workers=int(os.getenv("NEWS_FANOUT_WORKERS", "8")),
+        http_connect_timeout_seconds=float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "3.05")),
+        http_read_timeout_seconds=float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "10")),
+        http_pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "10")),
+        news_retry_attempts=int(os.getenv("NEWS_RETRY_ATTEMPTS", "2")),
+        news_retry_budget_seconds=float(os.getenv("NEWS_RETRY_BUDGET_SECONDS", "8")),
+        news_retry_base_delay_seconds=float(os.getenv("NEWS_RETRY_BASE_DELAY_SECONDS", "0.25")),
+        news_dedup_enabled=os.getenv("NEWS_DEDUP_ENABLED", "true").strip().lower() == "true",
+        news_dedup_min_similarity=float(os.getenv("NEWS_DEDUP_MIN_SIMILARITY", "0.75")),
+        news_dedup_overfetch=max(1, int(os.getenv("NEWS_DEDUP_OVERFETCH", "2"))),
+        article_store_enabled=os.getenv("ARTICLE_STORE_ENABLED", "true").strip().lower() == "true",
+        article_store_min_score=float(os.getenv("ARTICLE_STORE_MIN_SCORE", "1.0")),
+        article_store_min_relative_score=float(os.getenv("ARTICLE_STORE_MIN_RELATIVE_SCORE", "0.5")),
+        article_store_max_age_hours=float(os.getenv("ARTICLE_STORE_MAX_AGE_HOURS", "24")),
+        article_store_max_articles=int(os.getenv("ARTICLE_STORE_MAX_ARTICLES", "2000")),
+        rate_limit_db_path=os.getenv("RATE_LIMIT_DB_PATH", "data/rate_limits.db").strip(),
+        gnews_daily_limit=int(os.getenv("GNEWS_DAILY_LIMIT", "100")),
+        gnews_minute_limit=int(os.getenv("GNEWS_MINUTE_LIMIT", "10")),
+        newsapi_daily_limit=int(os.getenv("NEWSAPI_DAILY_LIMIT", "100")),
+        newsapi_minute_limit=int(os.getenv("NEWSAPI_MINUTE_LIMIT", "10")),
+        newsdata_daily_limit=int(os.getenv("NEWSDATA_DAILY_LIMIT", "200")),
+        newsdata_minute_limit=int(os.getenv("NEWSDATA_MINUTE_LIMIT", "10")),
+        provider_ewma_alpha=float(os.getenv("PROVIDER_EWMA_ALPHA", "0.3")),
+        provider_failure_threshold=int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "3")),
+        provider_cooldown_seconds=float(os.getenv("PROVIDER_COOLDOWN_SECONDS", "60")),
+        provider_health_half_life_seconds=float(os.getenv("PROVIDER_HEALTH_HALF_LIFE_SECONDS", "120")),
+        provider_explore_rate=float(os.getenv("PROVIDER_EXPLORE_RATE", "0.05")),
     )
@@ -6,6 +6,9 @@ import streamlit as st
 import time
 import json
 import os
+import uuid
+
+from app.services.article import Article
 
 
 def init_session_state() -> None:
@@ -37,6 +40,10 @@ def init_session_state() -> None:
     # Current active chat
     if "current_chat" not in st.session_state:
         st.session_state.current_chat = "default"
+
+    # Chat ids repeat across sessions; process-wide stores key on this as well
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     
     # Chat titles storage
     if "chat_titles" not in st.session_state:
@@ -131,7 +138,7 @@ def load_conversation(conversation_id: int) -> None:
     if not match:
         return
     
-    messages = list(match.get("messages", []))
+    messages = [_restore_sources(m) for m in match.get("messages", [])]
     st.session_state.messages = messages
     
     # Also load into conversations dict
@@ -171,6 +178,23 @@ def _persist_history(items: List[Dict[str, str]]) -> None:
     path = _history_path()
     try:
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(items, f, ensure_ascii=False, indent=2)
+            json.dump(items, f, ensure_ascii=False, indent=2, default=_to_json)
     except Exception:
         pass
+
+
+def _to_json(value):
+    """Serialize Article sources in their compact form."""
+    if isinstance(value, Article):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _restore_sources(message: Dict) -> Dict:
+    """Turn persisted source dicts back into Article records."""
+    sources = message.get("sources")
+    if not sources:
+        return message
+    restored = dict(message)
+    restored["sources"] = [s if isinstance(s, Article) else Article.from_dict(s) for s in sources]
+    return restored
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from cachetools import LRUCache
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_MAX_SUMMARY_CHARS = 900
+
+
+class RollingSummary(NamedTuple):
+    offset: int  # messages [0, offset) of the conversation are folded into text
+    text: str
+
+
+# (previous summary, newly aged-out messages) -> updated summary
+Summarizer = Callable[[str, List[Dict[str, str]]], str]
+
+
+def build_fold_prompt(previous_summary: str, messages: Sequence[Dict[str, str]]) -> str:
+    conversation_text = "\n".join(
+        f"{m.get('role', '').upper()}: {m.get('content', '')}".strip()
+        for m in messages
+    ).strip()
+    return f"""
+You compress conversations into concise memory blocks.
+
+Rules:
+- Preserve key facts, entities, and user intent.
+- Remove repetition and filler.
+- Neutral, factual style under 200 words.
+- Merge the new messages into the existing summary.
+
+Existing summary:
+{previous_summary or "None yet."}
+
+New messages:
+{conversation_text}
+
+Return only the updated summary text.
+""".strip()
+
+
+def fallback_summary(previous_summary: str, messages: Sequence[Dict[str, str]]) -> str:
+    """Summary without an LLM call: the first user request and the last answer."""
+    first_user = next((m.get("content", "") for m in messages if m.get("role") == "user"), "")
+    last_assistant = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "assistant"), "")
+    parts = [previous_summary] if previous_summary else []
+    if first_user:
+        parts.append(f"User intent: {first_user}")
+    if last_assistant:
+        parts.append(f"Assistant provided: {last_assistant}")
+    summary = "\n".join(parts).strip()
+    if len(summary) > _MAX_SUMMARY_CHARS:
+        summary = summary[:_MAX_SUMMARY_CHARS].rstrip() + "..."
+    return summary or "Earlier discussion summarized."
+
+
+def summarize_with_gemini(previous_summary: str, messages: List[Dict[str, str]]) -> str:
+    from app.config.settings import get_settings
+    from app.services.gemini_client import GeminiGenerationConfig, get_gemini_client
+
+    settings = get_settings()
+    if not (settings.gemini_api_key or settings.gemini_api_keys):
+        raise RuntimeError("missing_key")
+    client = get_gemini_client(
+        GeminiGenerationConfig(
+            model_name=settings.gemini_light_model,
+            max_output_tokens=200,
+            temperature=0.3,
+        )
+    )
+    text = client.generate(prompt=build_fold_prompt(previous_summary, messages)).strip()
+    # generate() reports failures as a user-facing "⚠️ ..." message rather than raising
+    if not text or text.startswith("⚠️"):
+        raise RuntimeError(text or "empty_summary")
+    if len(text) > _MAX_SUMMARY_CHARS:
+        text = text[:_MAX_SUMMARY_CHARS].rstrip() + "..."
+    return text
+
+
+class SummaryMemory:
+    """Rolling summaries of the messages that have aged out of the prompt window.
+
+    ``update`` is called after a turn completes and folds only the messages
+    that aged out since the last summary into it, on a background thread.
+    Prompt builders just ``get`` the stored summary, so no summarization
+    happens on the request path.
+    """
+
+    def __init__(self, summarizer: Optional[Summarizer] = None, max_conversations: int = 1024, workers: int = 2):
+        self._summarizer = summarizer or summarize_with_gemini
+        self._lock = threading.Lock()
+        self._summaries: LRUCache = LRUCache(maxsize=max_conversations)
+        # conversation -> offset of the fold queued or running for it
+        self._pending: Dict[str, int] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary")
+
+    def get(self, conversation_id: str, max_offset: Optional[int] = None) -> Optional[RollingSummary]:
+        """Stored summary of ``conversation_id``; with ``max_offset``, only one that stops at or before it."""
+        with self._lock:
+            summary = self._summaries.get(conversation_id)
+        if summary is None or (max_offset is not None and summary.offset > max_offset):
+            return None
+        return summary
+
+    def update(self, conversation_id: str, messages: Sequence[Dict[str, str]], keep_recent: int) -> Optional[Future]:
+        """Fold everything but the last ``keep_recent`` messages into the summary, in the background."""
+        target = len(messages) - keep_recent
+        if target <= 0:
+            return None
+        with self._lock:
+            current = self._summaries.get(conversation_id)
+            covered = current.offset if current is not None else 0
+            if target <= max(covered, self._pending.get(conversation_id, 0)):
+                return None
+            self._pending[conversation_id] = target
+        # Only role and content matter; don't hold on to sources and other message extras
+        snapshot = [{"role": m.get("role", ""), "content": m.get("content", "")} for m in messages[:target]]
+        return self._executor.submit(self._fold, conversation_id, snapshot, target)
+
+    def _fold(self, conversation_id: str, messages: List[Dict[str, str]], target: int) -> None:
+        try:
+            with self._lock:
+                current = self._summaries.get(conversation_id)
+            offset, previous = 0, ""
+            if current is not None and current.offset <= target:
+                offset, previous = current.offset, current.text
+            new_messages = messages[offset:target]
+            if not new_messages:
+                return
+            try:
+                text = self._summarizer(previous, new_messages)
+            except Exception as e:
+                logger.warning(f"Conversation summary failed, using fallback: {e}")
+                text = fallback_summary(previous, new_messages)
+            with self._lock:
+                latest = self._summaries.get(conversation_id)
+                # A fold that started later may have finished first
+                if latest is None or latest.offset < target:
+                    self._summaries[conversation_id] = RollingSummary(target, text)
+            logger.info(f"Folded {len(new_messages)} messages into the conversation summary (offset {target})")
+        finally:
+            with self._lock:
+                if self._pending.get(conversation_id) == target:
+                    del self._pending[conversation_id]
+
+    def forget(self, conversation_id: str) -> None:
+        with self._lock:
+            self._summaries.pop(conversation_id, None)
+
+
+_lock = threading.Lock()
+_memory: SummaryMemory | None = None
+
+
+def get_summary_memory() -> SummaryMemory:
+    """Return the process-wide conversation summary memory, creating it on first use."""
+    global _memory
+    with _lock:
+        if _memory is None:
+            _memory = SummaryMemory()
+        return _memory
@@ -1,8 +1,28 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple
 import json
-import re
+
+from app.memory.summary_memory import fallback_summary, get_summary_memory
+from app.prompts.token_budget import DEFAULT_HISTORY_SHARE, PromptPacker, get_token_estimator
+from app.services.article import Article
+from app.services.article_ranker import get_article_ranker
+
+
+def earlier_summary(conversation_id: Optional[str], history: List[Dict[str, str]], offset: int) -> str:
+    """Summary of ``history[:offset]``, the messages before the verbatim window.
+
+    Uses the rolling summary written by ``remember`` when one stops at or
+    before ``offset``; messages between its end and the window, or all of
+    them when there is none, are covered by ``fallback_summary``.
+    """
+    stored = get_summary_memory().get(conversation_id, max_offset=offset) if conversation_id else None
+    if stored is None:
+        return fallback_summary("", history[:offset])
+    if stored.offset < offset:
+        return fallback_summary(stored.text, history[stored.offset:offset])
+    return stored.text
 
 
 class PromptBuilder:
@@ -10,29 +30,35 @@ class PromptBuilder:
     def __init__(
         self,
         max_history_messages: int = 6,
-        max_article_chars: int = 800,
+        max_article_chars: Optional[int] = None,
         max_articles: int = 5,
         summarize_after: int = 10,
+        max_prompt_tokens: int = 6000,
     ):
         self.max_history_messages = max_history_messages
+        # Optional hard cap per article; the token budget decides the rest
         self.max_article_chars = max_article_chars
         self.max_articles = max_articles
         self.summarize_after = summarize_after
+        self.max_prompt_tokens = max_prompt_tokens
+        self.last_prompt_tokens = 0
 
    
     def build(
         self,
         history: List[Dict[str, str]],
-        news_articles: List[Dict[str, Any]],
+        news_articles: List[Article],
         user_query: str,
+        conversation_id: Optional[str] = None,
     ) -> str:
 
-        compressed_history = self._compress_history_if_needed(history)
-        formatted_history = self._format_history(compressed_history)
+        compressed_history = self._compress_history_if_needed(history, conversation_id)
         ranked_articles = self._rank_articles(news_articles, user_query)
-        formatted_news = self._format_news(ranked_articles)
 
-        return f"""
+        def render(history_lines: List[str], article_blocks: List[str]) -> str:
+            formatted_history = "\n".join(history_lines) or "No prior conversation."
+            formatted_news = "\n".join(article_blocks).strip() or "No relevant news articles retrieved."
+            return f"""
 You are NewsGPT — a professional real-time news intelligence assistant.
 
 
@@ -98,81 +124,50 @@ User Question:
 {user_query}
 """.strip()
 
+        packed = PromptPacker(self.max_prompt_tokens, get_token_estimator()).pack(
+            render,
+            history=self._history_lines(compressed_history),
+            articles=[
+                (partial(self._article_block, idx, article), self._article_content(article), score)
+                for idx, (article, score) in enumerate(ranked_articles, 1)
+            ],
+            pinned_history=1 if compressed_history and compressed_history[0].get("role") == "system" else 0,
+        )
+        self.last_prompt_tokens = packed.tokens
+        return packed.text
+
    
     # HISTORY FORMATTER
    
 
-    def _compress_history_if_needed(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    def _compress_history_if_needed(
+        self,
+        history: List[Dict[str, str]],
+        conversation_id: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
         if not history:
             return []
         if len(history) <= self.summarize_after:
             return history[-self.max_history_messages:]
-        old_messages = history[:-self.max_history_messages]
-        recent_messages = history[-self.max_history_messages:]
-        summary = self._generate_summary_text(old_messages)
+        offset = len(history) - self.max_history_messages
+        recent_messages = history[offset:]
+        # Written in the background by remember() after earlier turns; never summarized here
+        summary = earlier_summary(conversation_id, history, offset)
         return [{"role": "system", "content": f"Conversation Summary Memory:\n{summary}"}] + recent_messages
 
-    def build_summary_prompt(self, messages: List[Dict[str, str]]) -> str:
-        conversation_text = "\n".join(
-            f"{m.get('role', '').upper()}: {m.get('content', '')}".strip()
-            for m in messages
-        ).strip()
-        return f"""
-You compress conversations into concise memory blocks.
-
-Rules:
-- Preserve key facts, entities, and user intent.
-- Remove repetition and filler.
-- Neutral, factual style under 200 words.
-
-Conversation:
-{conversation_text}
+    def remember(self, conversation_id: str, history: List[Dict[str, str]]) -> None:
+        """Call after a turn completes: fold aged-out messages into the rolling summary off the request path."""
+        if len(history) + 1 > self.summarize_after:
+            # The next turn's user message joins the window, pushing one more message out
+            get_summary_memory().update(conversation_id, history, keep_recent=max(0, self.max_history_messages - 1))
 
-Return only the summary text.
-""".strip()
-
-    def _generate_summary_text(self, old_messages: List[Dict[str, str]]) -> str:
-        if not old_messages:
-            return ""
-        try:
-            from app.config.settings import get_settings
-            from app.services.gemini_client import GeminiClient, GeminiGenerationConfig
-            settings = get_settings()
-            if not settings.gemini_api_key:
-                raise RuntimeError("missing_key")
-            prompt = self.build_summary_prompt(old_messages)
-            client = GeminiClient(
-                api_key=settings.gemini_api_key,
-                config=GeminiGenerationConfig(
-                    model_name=settings.gemini_model,
-                    max_output_tokens=200,
-                    temperature=0.3,
-                ),
-            )
-            text = client.generate(prompt=prompt).strip()
-            if not text:
-                raise RuntimeError("empty_summary")
-            if len(text) > 900:
-                text = text[:900].rstrip() + "..."
-            return text
-        except Exception:
-            first_user = next((m.get("content", "") for m in old_messages if m.get("role") == "user"), "")
-            last_assistant = next((m.get("content", "") for m in reversed(old_messages) if m.get("role") == "assistant"), "")
-            parts = []
-            if first_user:
-                parts.append(f"User intent: {first_user}")
-            if last_assistant:
-                parts.append(f"Assistant provided: {last_assistant}")
-            summary = "\n".join(parts).strip()
-            if len(summary) > 900:
-                summary = summary[:900].rstrip() + "..."
-            return summary or "Earlier discussion summarized."
-
-    def _format_history(self, history: List[Dict[str, str]]) -> str:
+    def _history_lines(self, history: List[Dict[str, str]]) -> List[str]:
         if not history:
-            return "No prior conversation."
+            return []
 
-        trimmed = history[-self.max_history_messages:]
+        # Keep the summary memory block in front of the trimmed window
+        head = history[:1] if history[0].get("role") == "system" else []
+        trimmed = head + history[len(head):][-self.max_history_messages:]
 
         formatted = []
         for msg in trimmed:
@@ -180,60 +175,40 @@ Return only the summary text.
             content = msg.get("content", "").strip()
             formatted.append(f"{role}: {content}")
 
-        return "\n".join(formatted)
+        return formatted
 
     
 # ARTICLE RANKING (Relevance Boost)
     def _rank_articles(
         self,
-        articles: List[Dict[str, Any]],
+        articles: List[Article],
         query: str
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Tuple[Article, float]]:
 
         if not articles:
             return []
 
-        query_keywords = set(re.findall(r"\w+", query.lower()))
-
-        def score(article):
-            text = (
-                (article.get("title") or "") +
-                (article.get("description") or "") +
-                (article.get("content") or "")
-            ).lower()
-
-            matches = sum(1 for word in query_keywords if word in text)
-            return matches
-
-        ranked = sorted(articles, key=score, reverse=True)
-
-        return ranked[:self.max_articles]
+        # BM25 over cached per-article term vectors, plus a freshness prior
+        return get_article_ranker().rank_scored(articles, query, limit=self.max_articles)
 
     
     # ARTICLE FORMATTERs
     
 
-    def _format_news(self, articles: List[Dict[str, Any]]) -> str:
-        if not articles:
-            return "No relevant news articles retrieved."
-
-        formatted_blocks = []
-
-        for idx, article in enumerate(articles, 1):
-            content = (article.get("content") or "")[:self.max_article_chars]
+    def _article_content(self, article: Article) -> str:
+        return article.content[:self.max_article_chars] if self.max_article_chars else article.content
 
-            formatted_blocks.append(f"""
+    def _article_block(self, idx: int, article: Article, content: str) -> str:
+        return f"""
 Article {idx}:
-Title: {article.get("title")}
-Description: {article.get("description")}
+Title: {article.title}
+Description: {article.description}
 Content: {content}
-Source: {article.get("source_id") or article.get("source")}
-Published At: {article.get("pubDate") or article.get("published_at")}
-Link: {article.get("link")}
+Source: {article.source_id or article.source}
+Published At: {article.published_at}
+Link: {article.link}
 ----------------------------------------
-""")
-
-        return "\n".join(formatted_blocks).strip()
+"""
 
     
     # SAFE RESPONSE PARSE
@@ -285,24 +260,38 @@ class SimplePromptBuilder:
     def __init__(
         self,
         max_history_messages: int = 6,
-        max_article_chars: int = 800,
+        max_article_chars: Optional[int] = None,
         max_articles: int = 5,
+        summarize_after: int = 10,
+        max_prompt_tokens: int = 6000,
     ):
         self.max_history_messages = max_history_messages
+        # Optional hard cap per article; the token budget decides the rest
         self.max_article_chars = max_article_chars
         self.max_articles = max_articles
+        self.summarize_after = summarize_after
+        self.max_prompt_tokens = max_prompt_tokens
+        self.last_prompt_tokens = 0
 
     def build(
         self,
         history: List[Dict[str, str]],
-        news_articles: List[Dict[str, Any]],
+        news_articles: List[Article],
         user_query: str,
+        conversation_id: Optional[str] = None,
     ) -> str:
-
-        formatted_history = self._format_history(history)
-        formatted_news = self._format_news(news_articles)
-
-        return f"""You are Samvaad GPT — a helpful, conversational news assistant.
+        """``history`` is the whole conversation; only the last ``max_history_messages`` go in verbatim."""
+        # Earlier messages that no longer fit the history window, summarized after past turns
+        earlier = ""
+        if len(history) > self.summarize_after:
+            offset = len(history) - self.max_history_messages
+            earlier = f"EARLIER CONVERSATION (SUMMARY):\n{earlier_summary(conversation_id, history, offset)}\n\n"
+        ranked_articles = get_article_ranker().rank_scored(news_articles, user_query, limit=self.max_articles)
+
+        def render(history_lines: List[str], article_blocks: List[str]) -> str:
+            formatted_history = "\n".join(history_lines) or "No prior conversation."
+            formatted_news = "\n".join(article_blocks).strip() or "No relevant news articles retrieved."
+            return f"""You are Samvaad GPT — a helpful, conversational news assistant.
 
 Your job is to provide clear, natural-sounding responses about current events.
 
@@ -313,7 +302,7 @@ RULES:
 4. Keep a neutral, factual tone
 5. Don't use JSON or structured formats — just plain text
 
-CONVERSATION HISTORY:
+{earlier}CONVERSATION HISTORY:
 {formatted_history}
 
 NEWS ARTICLES:
@@ -323,10 +312,18 @@ USER QUESTION: {user_query}
 
 Provide a helpful, natural response:""".strip()
 
-    def _format_history(self, history: List[Dict[str, str]]) -> str:
-        if not history:
-            return "No prior conversation."
-
+        packed = PromptPacker(self.max_prompt_tokens, get_token_estimator()).pack(
+            render,
+            history=self._history_lines(history),
+            articles=[
+                (partial(self._article_block, idx, article), self._article_content(article), score)
+                for idx, (article, score) in enumerate(ranked_articles, 1)
+            ],
+        )
+        self.last_prompt_tokens = packed.tokens
+        return packed.text
+
+    def _history_lines(self, history: List[Dict[str, str]]) -> List[str]:
         trimmed = history[-self.max_history_messages:]
         formatted = []
         for msg in trimmed:
@@ -334,26 +331,34 @@ Provide a helpful, natural response:""".strip()
             content = msg.get("content", "").strip()
             formatted.append(f"{role}: {content}")
 
-        return "\n".join(formatted)
+        return formatted
 
-    def _format_news(self, articles: List[Dict[str, Any]]) -> str:
-        if not articles:
-            return "No relevant news articles retrieved."
+    def remember(self, conversation_id: str, history: List[Dict[str, str]]) -> None:
+        """Call after a turn completes with the full conversation; see ``PromptBuilder.remember``.
+
+        Folding costs a model call, so it waits until the conversation is
+        past ``summarize_after`` messages and longer than the packer's history
+        share; until then ``fallback_summary`` covers the earlier messages.
+        """
+        if len(history) + 1 <= self.summarize_after:
+            return
+        estimate = get_token_estimator().estimate
+        if sum(estimate(m.get("content", "")) for m in history) <= self.max_prompt_tokens * DEFAULT_HISTORY_SHARE:
+            return
+        get_summary_memory().update(conversation_id, history, keep_recent=max(0, self.max_history_messages - 1))
 
-        formatted_blocks = []
-        for idx, article in enumerate(articles, 1):
-            content = (article.get("content") or "")[:self.max_article_chars]
+    def _article_content(self, article: Article) -> str:
+        return article.content[:self.max_article_chars] if self.max_article_chars else article.content
 
-            formatted_blocks.append(f"""
+    def _article_block(self, idx: int, article: Article, content: str) -> str:
+        return f"""
 Article {idx}:
-Title: {article.get("title")}
-Description: {article.get("description")}
+Title: {article.title}
+Description: {article.description}
 Content: {content}
-Source: {article.get("source_id") or article.get("source")}
-Published: {article.get("pubDate") or article.get("published_at")}
-""")
-
-        return "\n".join(formatted_blocks).strip()
+Source: {article.source_id or article.source}
+Published: {article.published_at}
+"""
 
     def parse_response(self, llm_response: str) -> Dict[str, Any]:
         """Return the response directly as plain text without JSON parsing."""
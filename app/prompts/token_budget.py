@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+# Share of the input budget history may take when articles need the rest
+DEFAULT_HISTORY_SHARE = 0.3
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast estimate that leans high: ~4 characters or ~0.75 words per token, whichever is more."""
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / 4), math.ceil(len(text.split()) / 0.75))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` at a word boundary so its estimate fits ``max_tokens``."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    limit = max_tokens * 4
+    while limit > 0:
+        cut = text[:limit]
+        if " " in cut:
+            cut = cut[:cut.rindex(" ")]
+        cut = cut.rstrip() + "..."
+        if estimate_tokens(cut) <= max_tokens:
+            return cut
+        limit = int(limit * 0.9)
+    return ""
+
+
+def allocate(sizes: Sequence[int], weights: Sequence[float], budget: int) -> List[int]:
+    """Split ``budget`` in proportion to ``weights``, never giving an item more than its size.
+
+    What a small item doesn't use is shared out again among the rest.
+    """
+    shares = [0] * len(sizes)
+    open_items = [i for i, size in enumerate(sizes) if size > 0]
+    remaining = max(0, budget)
+    while open_items and remaining > 0:
+        total_weight = sum(max(weights[i], 1e-6) for i in open_items)
+        capped = []
+        for i in open_items:
+            share = int(remaining * max(weights[i], 1e-6) / total_weight)
+            if shares[i] + share >= sizes[i]:
+                capped.append(i)
+        if capped:
+            # Fill the items that fit entirely, then split what is left again
+            for i in capped:
+                remaining -= sizes[i] - shares[i]
+                shares[i] = sizes[i]
+            open_items = [i for i in open_items if i not in capped]
+            continue
+        for i in open_items:
+            shares[i] += int(remaining * max(weights[i], 1e-6) / total_weight)
+        break
+    return shares
+
+
+class TokenEstimator:
+    """Heuristic estimates, plus an exact counter for the final prompt when one is configured.
+
+    Exact counting (Gemini ``count_tokens``) is a network call, so packing
+    always uses the heuristic and only the assembled prompt is counted exactly.
+    """
+
+    def __init__(self, exact: Optional[TokenCounter] = None):
+        self._exact = exact
+
+    @property
+    def exact(self) -> bool:
+        return self._exact is not None
+
+    def estimate(self, text: str) -> int:
+        return estimate_tokens(text)
+
+    def count(self, text: str) -> int:
+        if self._exact is not None:
+            try:
+                return self._exact(text)
+            except Exception as e:
+                logger.warning(f"Exact token count failed, using estimate: {e}")
+        return estimate_tokens(text)
+
+
+@dataclass(frozen=True)
+class PackedPrompt:
+    text: str
+    tokens: int
+    budget: int
+    history_messages: int
+    articles: int
+
+
+# An article block: (format(content) -> block text, full content, relevance weight)
+ArticleBlock = Tuple[Callable[[str], str], str, float]
+
+
+class PromptPacker:
+    """Fills an input-token budget with history and articles.
+
+    The prompt template (system text and question) always goes in. Of what
+    is left, history takes at most ``history_share`` unless the articles
+    need less, newest messages first and a leading summary block kept. The
+    rest goes to articles in rank order: every kept article gets its title
+    and metadata, and content space is split by relevance weight. The
+    assembled prompt is counted once more and shrunk if it is still over.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        estimator: Optional[TokenEstimator] = None,
+        history_share: float = DEFAULT_HISTORY_SHARE,
+    ):
+        self.budget = budget
+        self.estimator = estimator or TokenEstimator()
+        self.history_share = history_share
+
+    def pack(
+        self,
+        render: Callable[[List[str], List[str]], str],
+        history: Sequence[str],
+        articles: Sequence[ArticleBlock],
+        pinned_history: int = 0,
+    ) -> PackedPrompt:
+        """``render(history lines, article blocks)`` builds the prompt; the first ``pinned_history`` lines go first."""
+        estimate = self.estimator.estimate
+        available = max(0, self.budget - estimate(render([], [])))
+
+        headers = [estimate(fmt("")) for fmt, _, _ in articles]
+        contents = [estimate(content) for _, content, _ in articles]
+        history_sizes = [estimate(line) + 1 for line in history]
+        history_budget = min(
+            sum(history_sizes),
+            max(int(available * self.history_share), available - sum(headers) - sum(contents)),
+        )
+        lines = self._pick_history(history, history_sizes, history_budget, pinned_history)
+
+        article_budget = max(0, available - sum(estimate(line) + 1 for line in lines))
+        overflow = 0
+        for _ in range(3):
+            blocks = self._fill_articles(articles, headers, contents, article_budget - overflow)
+            text = render(lines, blocks)
+            tokens = self.estimator.count(text)
+            if tokens <= self.budget:
+                break
+            overflow += tokens - self.budget + 8
+        else:
+            # Nothing left to shrink but the template itself
+            logger.warning(f"Prompt is {tokens} tokens, over the {self.budget} token budget")
+
+        packed = PackedPrompt(text=text, tokens=tokens, budget=self.budget, history_messages=len(lines), articles=len(blocks))
+        logger.info(
+            f"Prompt packed: {packed.tokens}/{packed.budget} tokens"
+            f"{'' if self.estimator.exact else ' (estimated)'}, "
+            f"history {packed.history_messages}/{len(history)}, articles {packed.articles}/{len(articles)}"
+        )
+        return packed
+
+    def _pick_history(self, history: Sequence[str], sizes: Sequence[int], budget: int, pinned: int) -> List[str]:
+        picked_head: List[str] = []
+        for line, size in zip(history[:pinned], sizes[:pinned]):
+            if size <= budget:
+                picked_head.append(line)
+                budget -= size
+        picked: List[str] = []
+        for line, size in zip(reversed(history[pinned:]), reversed(sizes[pinned:])):
+            if size > budget:
+                if not picked:
+                    # Not even the latest message fits whole: keep its beginning
+                    cut = truncate_to_tokens(line, budget - 1)
+                    if cut:
+                        picked.append(cut)
+                break
+            picked.append(line)
+            budget -= size
+        return picked_head + picked[::-1]
+
+    def _fill_articles(
+        self,
+        articles: Sequence[ArticleBlock],
+        headers: Sequence[int],
+        contents: Sequence[int],
+        budget: int,
+    ) -> List[str]:
+        # Drop the lowest-ranked articles until every remaining header fits
+        kept = len(articles)
+        while kept and sum(headers[:kept]) + kept > budget:
+            kept -= 1
+        shares = allocate(
+            contents[:kept],
+            [weight for _, _, weight in articles[:kept]],
+            budget - sum(headers[:kept]) - kept,
+        )
+        return [
+            fmt(truncate_to_tokens(content, share))
+            for (fmt, content, _), share in zip(articles[:kept], shares)
+        ]
+
+
+_lock = threading.Lock()
+_estimator: TokenEstimator | None = None
+
+
+def get_token_estimator() -> TokenEstimator:
+    """Return the process-wide estimator; PROMPT_TOKEN_COUNTER=gemini adds exact counting."""
+    global _estimator
+    with _lock:
+        if _estimator is None:
+            from app.config.settings import get_settings
+
+            settings = get_settings()
+            exact: Optional[TokenCounter] = None
+            if settings.prompt_token_counter == "gemini":
+                from app.services.gemini_client import GeminiGenerationConfig, get_gemini_client
+
+                def exact(text: str) -> int:
+                    return get_gemini_client(GeminiGenerationConfig(model_name=settings.gemini_model)).count_tokens(text)
+
+            _estimator = TokenEstimator(exact=exact)
+        return _estimator
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple
+
+# (source name, url) of another outlet carrying the same story
+RelatedSource = Tuple[str, str]
+
+_FIELDS = ("title", "description", "_content", "source", "source_id", "published_at", "url", "related_sources")
+
+
+class Article:
+    """Immutable news article.
+
+    ``link`` and ``pubDate`` are aliases of ``url`` and ``published_at``, and
+    ``content`` falls back to ``description``, so none of them is stored twice.
+    """
+
+    __slots__ = _FIELDS
+
+    def __init__(
+        self,
+        title: str = "",
+        description: str = "",
+        content: str = "",
+        source: str = "Unknown",
+        source_id: str = "",
+        published_at: str = "",
+        url: str = "",
+        related_sources: Tuple[RelatedSource, ...] = (),
+    ):
+        setattr_ = object.__setattr__
+        setattr_(self, "title", title or "")
+        setattr_(self, "description", description or "")
+        # Only keep content when it adds something beyond the description
+        setattr_(self, "_content", content if content and content != description else "")
+        setattr_(self, "source", source or "Unknown")
+        setattr_(self, "source_id", source_id or "")
+        setattr_(self, "published_at", published_at or "")
+        setattr_(self, "url", url or "")
+        setattr_(self, "related_sources", tuple(tuple(r) for r in related_sources))
+
+    @property
+    def content(self) -> str:
+        return self._content or self.description
+
+    @property
+    def link(self) -> str:
+        return self.url
+
+    @property
+    def pubDate(self) -> str:
+        return self.published_at
+
+    def replace(self, **changes: Any) -> "Article":
+        values = self.to_dict()
+        values.update(changes)
+        return Article.from_dict(values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact dict for persistence; aliases and empty fields are left out."""
+        data = {
+            "title": self.title,
+            "description": self.description,
+            "content": self._content,
+            "source": self.source,
+            "source_id": self.source_id,
+            "published_at": self.published_at,
+            "url": self.url,
+            "related_sources": [list(r) for r in self.related_sources],
+        }
+        return {key: value for key, value in data.items() if value}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Article":
+        """Build from a compact dict or a legacy article dict with duplicated aliases."""
+        related = data.get("related_sources") or ()
+        return cls(
+            title=data.get("title") or "",
+            description=data.get("description") or "",
+            content=data.get("content") or "",
+            source=data.get("source") or "Unknown",
+            source_id=data.get("source_id") or "",
+            published_at=data.get("published_at") or data.get("pubDate") or "",
+            url=data.get("url") or data.get("link") or "",
+            related_sources=[
+                (r.get("source") or "Unknown", r.get("url") or "") if isinstance(r, dict) else r
+                for r in related
+            ],
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Article is immutable; use replace()")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Article is immutable")
+
+    def __reduce__(self):
+        return (Article.from_dict, (self.to_dict(),))
+
+    def _key(self) -> Tuple:
+        return tuple(getattr(self, name) for name in _FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Article):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return f"Article(title={self.title!r}, source={self.source!r}, url={self.url!r})"
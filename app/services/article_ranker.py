@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+from app.config.settings import get_settings
+from app.services.article import Article
+from app.services.article_store import parse_timestamp
+from app.services.query_normalizer import normalize_terms
+
+
+class _TermVector:
+    __slots__ = ("terms", "length", "published")
+
+    def __init__(self, terms: Counter, published: Optional[float]):
+        self.terms = terms
+        self.length = sum(terms.values())
+        self.published = published
+
+
+class ArticleRanker:
+    """Ranks a handful of articles against a query: BM25 plus a freshness prior.
+
+    Each article is tokenized once (``normalize_terms``, so stopwords don't
+    count) and its term counts are cached, keyed by the article itself; a
+    follow-up over the same articles only builds the small term matrix.
+    IDF comes from the articles being ranked. The final score is the BM25
+    score scaled to [0, 1] plus ``freshness_weight`` times a prior that
+    halves every ``half_life_hours``.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        half_life_hours: float = 12,
+        freshness_weight: float = 0.3,
+        cache_size: int = 2048,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.half_life_seconds = half_life_hours * 3600
+        self.freshness_weight = freshness_weight
+        self._lock = threading.Lock()
+        self._vectors: LRUCache = LRUCache(maxsize=cache_size)
+        self._hits = 0
+        self._misses = 0
+
+    def rank(self, articles: Sequence[Article], query: str, limit: Optional[int] = None) -> List[Article]:
+        """``articles`` best first; ties keep their original order."""
+        return [article for article, _ in self.rank_scored(articles, query, limit)]
+
+    def rank_scored(
+        self,
+        articles: Sequence[Article],
+        query: str,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[Article, float]]:
+        """``rank`` with each article's score."""
+        if not articles:
+            return []
+        scores = self.scores(articles, query)
+        order = np.argsort(-scores, kind="stable")
+        ranked = [(articles[i], float(scores[i])) for i in order]
+        return ranked[:limit] if limit is not None else ranked
+
+    def scores(self, articles: Sequence[Article], query: str) -> np.ndarray:
+        vectors = [self._vector(article) for article in articles]
+        relevance = self._bm25(vectors, list(dict.fromkeys(normalize_terms(query))))
+        top = relevance.max() if relevance.size else 0.0
+        if top > 0:
+            relevance = relevance / top
+        return relevance + self.freshness_weight * self._freshness(vectors, time.time())
+
+    def _bm25(self, vectors: List[_TermVector], terms: List[str]) -> np.ndarray:
+        if not terms:
+            return np.zeros(len(vectors))
+        tf = np.array([[v.terms.get(term, 0) for term in terms] for v in vectors], dtype=float)
+        lengths = np.array([v.length for v in vectors], dtype=float)
+        avg_length = lengths.mean() or 1.0
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((len(vectors) - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+        return (tf * (self.k1 + 1) / (tf + norm[:, None])) @ idf
+
+    def _freshness(self, vectors: List[_TermVector], now: float) -> np.ndarray:
+        # Undated articles get no boost
+        published = np.array([v.published if v.published is not None else np.nan for v in vectors], dtype=float)
+        age = np.clip(now - published, 0, None)
+        prior = np.power(0.5, age / self.half_life_seconds)
+        return np.nan_to_num(prior, nan=0.0)
+
+    def _vector(self, article: Article) -> _TermVector:
+        with self._lock:
+            vector = self._vectors.get(article)
+            if vector is not None:
+                self._hits += 1
+                return vector
+            self._misses += 1
+        # content falls back to description; don't count those terms twice
+        text = " ".join(dict.fromkeys((article.title, article.description, article.content)))
+        vector = _TermVector(Counter(normalize_terms(text)), parse_timestamp(article.published_at))
+        with self._lock:
+            self._vectors[article] = vector
+        return vector
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._vectors), "hits": self._hits, "misses": self._misses}
+
+
+_lock = threading.Lock()
+_ranker: ArticleRanker | None = None
+
+
+def get_article_ranker() -> ArticleRanker:
+    """Return the process-wide article ranker, creating it on first use."""
+    global _ranker
+    with _lock:
+        if _ranker is None:
+            settings = get_settings()
+            _ranker = ArticleRanker(
+                half_life_hours=settings.rank_freshness_half_life_hours,
+                freshness_weight=settings.rank_freshness_weight,
+            )
+        return _ranker
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from app.config.settings import get_settings
+from app.services.article import Article
+from app.services.dedup import canonical_url
+from app.services.query_normalizer import normalize_terms
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """Parse a provider date ("2024-05-01T10:00:00Z" or "2024-05-01") to epoch seconds."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class _StoredArticle:
+    __slots__ = ("article", "terms", "length", "published", "countries")
+
+    def __init__(self, article: Article, terms: Counter, published: float, countries: FrozenSet[str]):
+        self.article = article
+        self.terms = terms
+        self.length = sum(terms.values())
+        self.published = published
+        self.countries = countries
+
+
+class ArticleStore:
+    """In-memory article corpus with an inverted index and BM25 scoring.
+
+    Every formatted provider result is added along with the country it was
+    fetched for, and a search only returns articles fetched for its country.
+    Articles expire once their ``published_at`` is older than ``max_age_hours``.
+    """
+
+    def __init__(
+        self,
+        max_age_hours: float = 24,
+        max_articles: int = 2000,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.max_age_seconds = max_age_hours * 3600
+        self.max_articles = max_articles
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._docs: Dict[str, _StoredArticle] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._total_length = 0
+
+    def add(self, articles: List[Article], country: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            for article in articles:
+                doc_id = canonical_url(article.url)
+                if not doc_id:
+                    continue
+                published = parse_timestamp(article.published_at) or now
+                if now - published > self.max_age_seconds:
+                    continue
+                previous = self._remove(doc_id)
+                countries = frozenset([country]) | (previous.countries if previous is not None else frozenset())
+                # content falls back to description; don't count those terms twice
+                text = " ".join(dict.fromkeys((article.title, article.description, article.content)))
+                doc = _StoredArticle(article, Counter(normalize_terms(text)), published, countries)
+                self._docs[doc_id] = doc
+                self._total_length += doc.length
+                for term in doc.terms:
+                    self._postings.setdefault(term, set()).add(doc_id)
+            self._purge(now)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        since: Optional[float] = None,
+        country: Optional[str] = None,
+        min_score: float = 0.0,
+        min_relative_score: float = 0.0,
+    ) -> List[Article]:
+        """Return up to ``limit`` articles matching every query term, best BM25 score first.
+
+        A hit needs at least ``min_score`` and at least ``min_relative_score``
+        times the best hit's score.
+        """
+        terms = set(normalize_terms(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            self._purge(time.time())
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+
+            postings = [self._postings.get(term, set()) for term in terms]
+            candidates = set.intersection(*postings) if postings else set()
+
+            scored = []
+            for doc_id in candidates:
+                doc = self._docs[doc_id]
+                if since is not None and doc.published < since:
+                    continue
+                if country is not None and country not in doc.countries:
+                    continue
+                score = 0.0
+                for term, posting in zip(terms, postings):
+                    tf = doc.terms[term]
+                    idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                    norm = self.k1 * (1 - self.b + self.b * doc.length / avg_length)
+                    score += idf * tf * (self.k1 + 1) / (tf + norm)
+                if score >= min_score:
+                    scored.append((score, doc.published, doc.article))
+
+        if not scored:
+            return []
+        floor = max(score for score, _, _ in scored) * min_relative_score
+        scored = [item for item in scored if item[0] >= floor]
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [article for _, _, article in scored[:limit]]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+    def _remove(self, doc_id: str) -> Optional[_StoredArticle]:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return None
+        self._total_length -= doc.length
+        for term in doc.terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[term]
+        return doc
+
+    def _purge(self, now: float) -> None:
+        expired = [doc_id for doc_id, doc in self._docs.items() if now - doc.published > self.max_age_seconds]
+        overflow = len(self._docs) - len(expired) - self.max_articles
+        if overflow > 0:
+            live = sorted(
+                (doc.published, doc_id) for doc_id, doc in self._docs.items()
+                if now - doc.published <= self.max_age_seconds
+            )
+            expired.extend(doc_id for _, doc_id in live[:overflow])
+        for doc_id in expired:
+            self._remove(doc_id)
+
+
+_lock = threading.Lock()
+_store: ArticleStore | None = None
+
+
+def get_article_store() -> ArticleStore:
+    """Return the process-wide article store, creating it on first use."""
+    global _store
+    with _lock:
+        if _store is None:
+            settings = get_settings()
+            _store = ArticleStore(
+                max_age_hours=settings.article_store_max_age_hours,
+                max_articles=settings.article_store_max_articles,
+            )
+        return _store
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Dict, List, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+
+from app.services.article import Article
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_TRACKING_PARAMS = {"fbclid", "gclid", "ocid", "cmpid", "ref", "ref_src", "smid", "src"}
+_WORD_RE = re.compile(r"\w+")
+# Outlet suffix appended by aggregators: "Headline - Reuters", "Headline | ET"
+_TITLE_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+(?:[\w.&']+\s?){1,3}$")
+
+# Hash permutations h -> (a*h + b) mod p; 32-bit inputs keep a*h inside uint64
+_NUM_PERMUTATIONS = 64
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(1729)
+_PERM_A = _rng.integers(1, (1 << 31) - 1, size=_NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, (1 << 31) - 1, size=_NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def canonical_url(url: str) -> str:
+    """Reduce a URL to host+path+meaningful query so syndicated copies compare equal."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("m."):
+        host = host[2:]
+    path = re.sub(r"/(amp|index\.html?)/?$", "", parts.path).rstrip("/")
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    canonical = f"{host}{path}"
+    if query:
+        canonical += "?" + urlencode(query)
+    return canonical
+
+
+def _shingle_hashes(text: str, size: int = 2) -> np.ndarray:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    return np.frombuffer(digests, dtype=">u8").astype(np.uint64)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature of the text's word shingles under fixed random permutations."""
+    hashes = _shingle_hashes(text) & np.uint64(0xFFFFFFFF)
+    if hashes.size == 0:
+        return np.full(_NUM_PERMUTATIONS, _MERSENNE_PRIME, dtype=np.uint64)
+    return ((hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME).min(axis=0)
+
+
+def similarity_matrix(signatures: np.ndarray) -> np.ndarray:
+    """Pairwise estimated Jaccard similarity between MinHash signatures."""
+    return (signatures[:, None, :] == signatures[None, :, :]).mean(axis=-1)
+
+
+def deduplicate_articles(articles: Sequence[Article], min_similarity: float = 0.75) -> List[Article]:
+    """Merge URL-canonical and near-duplicate articles, keeping every source link.
+
+    The first article of each cluster is kept (so provider ranking is preserved),
+    its text is filled in from longer copies, and the other copies are listed
+    in ``related_sources``.
+    """
+    n = len(articles)
+    if n < 2:
+        return list(articles)
+
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    urls = [canonical_url(a.url) for a in articles]
+    first_by_url: Dict[str, int] = {}
+    for i, url in enumerate(urls):
+        if not url:
+            continue
+        if url in first_by_url:
+            union(first_by_url[url], i)
+        else:
+            first_by_url[url] = i
+
+    texts = [
+        f"{_TITLE_SUFFIX_RE.sub('', a.title)} {a.description}"
+        for a in articles
+    ]
+    has_text = np.array([len(_WORD_RE.findall(t)) >= 4 for t in texts])
+    signatures = np.stack([minhash_signature(t) for t in texts])
+    near = (similarity_matrix(signatures) >= min_similarity) & has_text[:, None] & has_text[None, :]
+    for i, j in zip(*np.nonzero(np.triu(near, k=1))):
+        union(int(i), int(j))
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(i)
+
+    merged = [_merge_cluster([articles[i] for i in members]) for _, members in sorted(clusters.items())]
+    if len(merged) < n:
+        logger.info(f"Dedup: collapsed {n} articles into {len(merged)} clusters")
+    return merged
+
+
+def _merge_cluster(cluster: List[Article]) -> Article:
+    base = cluster[0]
+    if len(cluster) == 1:
+        return base
+
+    description = max((a.description for a in cluster), key=len)
+    content = max((a.content for a in cluster), key=len)
+
+    related = list(base.related_sources)
+    seen = {canonical_url(base.url)}
+    seen.update(canonical_url(url) for _, url in related)
+    for a in cluster[1:]:
+        for source, url in [(a.source, a.url), *a.related_sources]:
+            key = canonical_url(url)
+            if key and key not in seen:
+                seen.add(key)
+                related.append((source, url))
+
+    return base.replace(description=description, content=content, related_sources=related)
@@ -1,18 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import threading
 import time
+import weakref
 from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 import os
 from dotenv import load_dotenv
 
+import google.ai.generativelanguage as glm
 import google.generativeai as genai
 
+from app.config.settings import get_settings
+from app.services.key_pool import ApiKeyPool, get_key_pool
+from app.services.model_availability import ModelAvailability, get_model_availability
+from app.services.response_cache import ResponseCache, get_response_cache
+from app.services.retry_policy import RetryPolicy
 from app.utils.logger import get_logger
 
 load_dotenv()
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+_UNPARSEABLE = "I couldn't parse a response from Gemini. Please try again."
+
 
 @dataclass(frozen=True)
 class GeminiGenerationConfig:
@@ -21,85 +35,626 @@ class GeminiGenerationConfig:
     temperature: float = 0.7
 
 
+# Builds a model handle for (api_key, model_name, config); swap in a fake backend for tests
+ModelFactory = Callable[[str, str, GeminiGenerationConfig], Any]
+
+
+class KeyedModel:
+    """A model handle bound to one API key, with the ``GenerativeModel`` call surface we use.
+
+    ``GenerativeModel`` takes its service client from the process-wide
+    ``genai.configure``, so several keys can't be used side by side without
+    reaching into its private fields. This builds the same requests from the
+    SDK's public types and sends them through the registry's per-key clients.
+    """
+
+    def __init__(self, registry: "GeminiRegistry", api_key: str, model_name: str, config: GeminiGenerationConfig):
+        self._registry = registry
+        self._api_key = api_key
+        self.model_name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        self._generation_config = genai.protos.GenerationConfig(
+            max_output_tokens=config.max_output_tokens,
+            temperature=config.temperature,
+        )
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        client = self._registry.service_client(self._api_key)
+        if stream:
+            return genai.types.GenerateContentResponse.from_iterator(client.stream_generate_content(self._request(prompt)))
+        return genai.types.GenerateContentResponse.from_response(client.generate_content(self._request(prompt)))
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        client = self._registry.async_service_client(self._api_key)
+        if stream:
+            iterator = await client.stream_generate_content(self._request(prompt))
+            return await genai.types.AsyncGenerateContentResponse.from_aiterator(iterator)
+        return genai.types.AsyncGenerateContentResponse.from_response(await client.generate_content(self._request(prompt)))
+
+    def count_tokens(self, text: str):
+        request = genai.protos.CountTokensRequest(model=self.model_name, generate_content_request=self._request(text))
+        return self._registry.service_client(self._api_key).count_tokens(request)
+
+    def _request(self, prompt: str):
+        return genai.protos.GenerateContentRequest(
+            model=self.model_name,
+            contents=[genai.protos.Content(role="user", parts=[genai.protos.Part(text=prompt)])],
+            generation_config=self._generation_config,
+        )
+
+
+class GeminiRegistry:
+    """Process-wide cache of configured clients and model handles.
+
+    Each API key gets its own service client, created with that key rather
+    than through the global ``genai.configure``, and every (key, model,
+    config) its own ``KeyedModel``; handles are never modified once shared.
+    Async service clients belong to an event loop, so there is one per key
+    and loop.
+    """
+
+    def __init__(self, model_factory: Optional[ModelFactory] = None):
+        self._lock = threading.Lock()
+        self._model_factory = model_factory
+        self._service_clients: Dict[str, Any] = {}
+        self._async_service_clients: Dict[str, "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]"] = {}
+        self._models: Dict[Tuple[str, str, GeminiGenerationConfig], Any] = {}
+        self._clients: Dict[Tuple[str, GeminiGenerationConfig], "GeminiClient"] = {}
+        self._pool: Optional[ApiKeyPool] = None
+        self._pooled_clients: Dict[GeminiGenerationConfig, "GeminiClient"] = {}
+        self._default_key: Optional[str] = None
+
+    def client(self, api_key: str, config: GeminiGenerationConfig) -> "GeminiClient":
+        with self._lock:
+            client = self._clients.get((api_key, config))
+            if client is None:
+                client = GeminiClient(api_key=api_key, config=config, registry=self)
+                self._clients[(api_key, config)] = client
+            return client
+
+    def pooled_client(self, pool: ApiKeyPool, config: GeminiGenerationConfig) -> "GeminiClient":
+        """Client that rotates over the keys of ``pool``; a new pool replaces the old clients."""
+        with self._lock:
+            if pool is not self._pool:
+                self._pool = pool
+                self._pooled_clients = {}
+            client = self._pooled_clients.get(config)
+            if client is None:
+                client = GeminiClient(api_key="", config=config, registry=self, key_pool=pool)
+                self._pooled_clients[config] = client
+            return client
+
+    def model(self, api_key: str, model_name: str, config: GeminiGenerationConfig) -> Any:
+        key = (api_key, model_name, config)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                if self._model_factory is not None:
+                    model = self._model_factory(api_key, model_name, config)
+                else:
+                    model = KeyedModel(self, api_key, model_name, config)
+                self._models[key] = model
+            return model
+
+    def async_model(self, api_key: str, model_name: str, config: GeminiGenerationConfig) -> Any:
+        """``model()``; a ``KeyedModel`` picks the async client of the running event loop per call."""
+        return self.model(api_key, model_name, config)
+
+    def use_default_key(self, api_key: str) -> None:
+        """Record the configured key; when it changes, drop everything built for the old one."""
+        with self._lock:
+            previous, self._default_key = self._default_key, api_key
+        if previous is not None and previous != api_key:
+            logger.info("GOOGLE_API_KEY changed; discarding cached Gemini clients")
+            self.forget(previous)
+
+    def forget(self, api_key: str) -> None:
+        with self._lock:
+            self._service_clients.pop(api_key, None)
+            self._async_service_clients.pop(api_key, None)
+            self._models = {k: v for k, v in self._models.items() if k[0] != api_key}
+            self._clients = {k: v for k, v in self._clients.items() if k[0] != api_key}
+
+    def service_client(self, api_key: str) -> Any:
+        """The key's synchronous service client (thread-safe, shared by its models)."""
+        with self._lock:
+            client = self._service_clients.get(api_key)
+            if client is None:
+                client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+                self._service_clients[api_key] = client
+            return client
+
+    def async_service_client(self, api_key: str) -> Any:
+        """The key's async service client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_service_clients.setdefault(api_key, weakref.WeakKeyDictionary())
+            client = clients.get(loop)
+            if client is None:
+                client = glm.GenerativeServiceAsyncClient(client_options={"api_key": api_key})
+                clients[loop] = client
+            return client
+
+
+_lock = threading.Lock()
+_registry: GeminiRegistry | None = None
+
+
+def get_gemini_registry() -> GeminiRegistry:
+    """Return the process-wide Gemini registry, creating it on first use."""
+    global _registry
+    with _lock:
+        if _registry is None:
+            _registry = GeminiRegistry()
+        return _registry
+
+
+def get_gemini_client(config: GeminiGenerationConfig, api_key: Optional[str] = None) -> "GeminiClient":
+    """Shared client for ``config``.
+
+    Uses the given key, else the GOOGLE_API_KEYS pool when one is
+    configured, else GOOGLE_API_KEY.
+    """
+    registry = get_gemini_registry()
+    if api_key is None:
+        pool = get_key_pool()
+        if pool is not None:
+            return registry.pooled_client(pool, config)
+        api_key = get_settings().gemini_api_key
+        registry.use_default_key(api_key)
+    return registry.client(api_key, config)
+
+
 class GeminiClient:
-    def __init__(self, *, api_key: str, config: GeminiGenerationConfig):
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        config: GeminiGenerationConfig,
+        registry: Optional[GeminiRegistry] = None,
+        availability: Optional[ModelAvailability] = None,
+        key_pool: Optional[ApiKeyPool] = None,
+    ):
         self._api_key = api_key
+        # With a pool, every attempt picks its own key and api_key is unused
+        self._key_pool = key_pool
         self._config = config
+        self._registry = registry if registry is not None else get_gemini_registry()
+        # Shared knowledge of missing models and tripped circuits
+        self._availability = availability if availability is not None else get_model_availability()
+        self._retry_policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
 
-        if self._api_key:
-            genai.configure(api_key=self._api_key)
-
-    def generate(self, *, prompt: str) -> str:
-        if not self._api_key:
+    def generate(self, *, prompt: str, cache_key: Optional[str] = None) -> str:
+        """Generate a full response; with ``cache_key``, answers are shared through the response cache."""
+        if not (self._api_key or self._key_pool):
             logger.warning("GOOGLE_API_KEY is missing; returning fallback response")
             return "Gemini API key is not configured. Please set GOOGLE_API_KEY in your .env file."
-        
+
+        cache = self._response_cache(cache_key)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM response cache hit")
+                return cached
+
         # Debug: Log API key status (masked for security)
-        logger.info(f"API Key present: {bool(self._api_key)}, Length: {len(self._api_key) if self._api_key else 0}")
+        if self._key_pool is not None:
+            logger.info(f"Using Gemini key pool with {len(self._key_pool.keys)} keys")
+        else:
+            logger.info(f"API Key present: {bool(self._api_key)}, Length: {len(self._api_key) if self._api_key else 0}")
         logger.info(f"Attempting model: {self._config.model_name}")
 
-        candidates_models = [self._config.model_name, "gemini-2.0-flash-lite", "gemini-2.0-flash-exp"]
+        text, error = self._with_fallback(lambda model: _response_text(model.generate_content(prompt)))
+        if text is None:
+            return error
+        if cache is not None and text != _UNPARSEABLE:
+            cache.set(cache_key, text)
+        return text
+
+    def stream(self, *, prompt: str, cache_key: Optional[str] = None) -> Iterator[str]:
+        """Yield text deltas as Gemini produces them.
+
+        Retries and model fallback apply until the first delta arrives; after
+        that the text is already on screen, so a failure ends the stream
+        with a short notice instead of starting over.
+        """
+        if not (self._api_key or self._key_pool):
+            logger.warning("GOOGLE_API_KEY is missing; returning fallback response")
+            yield "Gemini API key is not configured. Please set GOOGLE_API_KEY in your .env file."
+            return
+
+        cache = self._response_cache(cache_key)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM response cache hit")
+                yield cached
+                return
+
+        logger.info(f"Attempting model (streaming): {self._config.model_name}")
+
+        def call(model):
+            response = model.generate_content(prompt, stream=True)
+            chunks = iter(response)
+            # Pull up to the first text so connection and quota errors surface here, inside the retry loop
+            for chunk in chunks:
+                text = _chunk_text(chunk)
+                if text:
+                    return text, chunks
+            return None, chunks
+
+        started, error = self._with_fallback(call)
+        if started is None:
+            yield error
+            return
+        first, chunks = started
+        if first is None:
+            yield _UNPARSEABLE
+            return
+
+        parts = [first]
+        yield first
+        try:
+            for chunk in chunks:
+                text = _chunk_text(chunk)
+                if text:
+                    parts.append(text)
+                    yield text
+        except Exception:
+            logger.exception("Gemini stream interrupted")
+            yield "\n\n⚠️ The response was interrupted. Please try again."
+            return
+        # Only complete answers are cached
+        if cache is not None:
+            cache.set(cache_key, "".join(parts))
+
+    def count_tokens(self, text: str) -> int:
+        """Exact input token count for ``text`` under the configured model (one API call).
+
+        A pooled client spends a request from the pool like any other call.
+        """
+        api_key = self._key_pool.acquire() if self._key_pool is not None else self._api_key
+        if api_key is None:
+            raise RuntimeError("Every Gemini key is cooling down or out of budget")
+        model = self._registry.model(api_key, self._config.model_name, self._config)
+        try:
+            total = model.count_tokens(text).total_tokens
+        except Exception as e:
+            if self._key_pool is not None:
+                lower = str(e).lower()
+                if "429" in lower or "quota" in lower or "resource exhausted" in lower:
+                    self._key_pool.report_rate_limited(api_key)
+                else:
+                    self._key_pool.report_error(api_key)
+            raise
+        if self._key_pool is not None:
+            self._key_pool.report_success(api_key)
+        return int(total)
+
+    async def agenerate(self, *, prompt: str, cache_key: Optional[str] = None) -> str:
+        """Async ``generate``; backoff sleeps don't block the event loop.
+
+        At most GEMINI_MAX_CONCURRENCY requests per event loop are in flight,
+        and cancelling the awaiting task cancels the request itself.
+        """
+        if not (self._api_key or self._key_pool):
+            logger.warning("GOOGLE_API_KEY is missing; returning fallback response")
+            return "Gemini API key is not configured. Please set GOOGLE_API_KEY in your .env file."
+
+        cache = self._response_cache(cache_key)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM response cache hit")
+                return cached
+
+        async def call(model) -> str:
+            return _response_text(await model.generate_content_async(prompt))
+
+        text, error = await self._awith_fallback(call)
+        if text is None:
+            return error
+        if cache is not None and text != _UNPARSEABLE:
+            cache.set(cache_key, text)
+        return text
+
+    async def astream(self, *, prompt: str, cache_key: Optional[str] = None) -> AsyncIterator[str]:
+        """Async ``stream``; holds one concurrency slot until the stream ends or is closed."""
+        if not (self._api_key or self._key_pool):
+            logger.warning("GOOGLE_API_KEY is missing; returning fallback response")
+            yield "Gemini API key is not configured. Please set GOOGLE_API_KEY in your .env file."
+            return
+
+        cache = self._response_cache(cache_key)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM response cache hit")
+                yield cached
+                return
+
+        async def call(model):
+            response = await model.generate_content_async(prompt, stream=True)
+            chunks = response.__aiter__()
+            async for chunk in chunks:
+                text = _chunk_text(chunk)
+                if text:
+                    return text, chunks
+            return None, chunks
+
+        started, error = await self._awith_fallback(call, hold=True)
+        if started is None:
+            yield error
+            return
+        first, chunks = started
+        try:
+            if first is None:
+                yield _UNPARSEABLE
+                return
+
+            parts = [first]
+            yield first
+            try:
+                async for chunk in chunks:
+                    text = _chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield text
+            except Exception:
+                logger.exception("Gemini stream interrupted")
+                yield "\n\n⚠️ The response was interrupted. Please try again."
+                return
+            if cache is not None:
+                cache.set(cache_key, "".join(parts))
+        finally:
+            # Runs on completion, consumer aclose() and cancellation alike
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            _semaphore().release()
+
+    async def _awith_fallback(
+        self,
+        call: Callable[[Any], Awaitable[T]],
+        hold: bool = False,
+    ) -> Tuple[Optional[T], str]:
+        """Async ``_with_fallback``; each attempt takes a concurrency slot.
+
+        The slot is released before any backoff sleep. With ``hold`` it stays
+        taken after a successful call and the caller must release it.
+        """
+        semaphore = _semaphore()
+        deadline = time.monotonic() + get_settings().gemini_deadline_seconds
         last_error_msg = ""
-        for model_name in candidates_models:
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    model = genai.GenerativeModel(model_name)
-                    response = model.generate_content(
-                        prompt,
-                        generation_config=genai.types.GenerationConfig(
-                            max_output_tokens=self._config.max_output_tokens,
-                            temperature=self._config.temperature,
-                        ),
-                    )
-                    text = getattr(response, "text", None)
-                    if isinstance(text, str) and text.strip():
-                        return text.strip()
-                    try:
-                        candidates = getattr(response, "candidates", None)
-                        if candidates:
-                            return str(candidates[0]).strip()
-                    except Exception:
-                        logger.exception("Gemini response parsing failed")
-                    return "I couldn't parse a response from Gemini. Please try again."
-                except Exception as e:
-                    logger.exception(f"Gemini generation failed for model {model_name} (attempt {attempt + 1}/{max_retries})")
-                    error_msg = str(e)
-                    last_error_msg = error_msg
-                    lower = error_msg.lower()
-                    
-                    # Log the exact error for debugging
-                    logger.error(f"Error details: {error_msg}")
-                    
-                    if "timeout" in lower or "failed to connect" in lower or "503" in error_msg:
-                        if attempt < max_retries - 1:
-                            wait_time = 2 ** attempt
-                            time.sleep(wait_time)
-                            continue
-                        break
-                    if "429" in error_msg or "quota" in lower or "resource exhausted" in lower:
-                        if attempt < max_retries - 1:
-                            wait_time = 2 ** attempt
-                            logger.info(f"Quota exceeded, retrying in {wait_time} seconds...")
-                            time.sleep(wait_time)
-                            continue
-                        return "⚠️ Gemini API quota exceeded. Please try again later or upgrade your plan."
-                    if "404" in error_msg or "not found" in lower:
+        retries = 0
+        while time.monotonic() < deadline:
+            target, wait = self._next_target()
+            if target is None:
+                if not wait or time.monotonic() + wait >= deadline:
+                    break
+                await asyncio.sleep(wait)
+                continue
+            api_key, model_name = target
+            await semaphore.acquire()
+            try:
+                model = self._registry.async_model(api_key, model_name, self._config)
+                result = await call(model)
+            except Exception as e:
+                semaphore.release()
+                last_error_msg = str(e)
+                action, value = self._on_error(api_key, model_name, e)
+                if action == "fail":
+                    return None, value
+                if action == "retry":
+                    delay = self._retry_policy.backoff(retries)
+                    retries += 1
+                    if time.monotonic() + delay >= deadline:
                         break
-                    if ("permission" in lower or "forbidden" in lower or "unauthorized" in lower or "invalid api key" in lower or "401" in error_msg):
-                        return "⚠️ Gemini API permission denied. Please check your API key."
-                    if attempt < max_retries - 1:
-                        wait_time = 1
-                        logger.info(f"API error, retrying in {wait_time} seconds...")
-                        time.sleep(wait_time)
-                        continue
+                    await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancellation: give the slot back and let it propagate
+                semaphore.release()
+                raise
+            if not hold:
+                semaphore.release()
+            self._record_success(api_key, model_name)
+            return result, ""
+        return None, _final_error(last_error_msg or self._last_known_error())
+
+    def _response_cache(self, cache_key: Optional[str]) -> Optional[ResponseCache]:
+        """The response cache, if this call may use it."""
+        if cache_key is None:
+            return None
+        settings = get_settings()
+        if not settings.llm_cache_enabled:
+            return None
+        cache = get_response_cache()
+        # Sampled answers vary per call; sharing one is opt-in
+        if self._config.temperature > 0 and not settings.llm_cache_nonzero_temperature:
+            cache.record_skip()
+            return None
+        return cache
+
+    def _with_fallback(self, call: Callable[[Any], T]) -> Tuple[Optional[T], str]:
+        """Run ``call(model)`` along the fallback chain until it succeeds or the deadline passes.
+
+        Each failure is recorded in the model availability registry, which
+        decides the next model to try: a missing model is skipped, and one
+        that keeps failing is skipped once its circuit opens. Retries back
+        off with jitter; no new attempt starts after GEMINI_DEADLINE_SECONDS.
+        With a key pool, each attempt takes the next key from the pool and a
+        rate-limited key is swapped for another without backing off.
+
+        Returns ``(result, "")`` on success, or ``(None, message)`` with a
+        user-facing error message.
+        """
+        deadline = time.monotonic() + get_settings().gemini_deadline_seconds
+        last_error_msg = ""
+        retries = 0
+        while time.monotonic() < deadline:
+            target, wait = self._next_target()
+            if target is None:
+                if not wait or time.monotonic() + wait >= deadline:
                     break
-        if "404" in last_error_msg or "not found" in last_error_msg.lower():
-            return "⚠️ Gemini model not available. Falling back failed. Please set a supported model."
-        if ("permission" in last_error_msg.lower() or "forbidden" in last_error_msg.lower() or "unauthorized" in last_error_msg.lower() or "invalid api key" in last_error_msg.lower() or "401" in last_error_msg):
-            return "⚠️ Gemini API permission denied. Please check your API key."
-        if "timeout" in last_error_msg.lower() or "failed to connect" in last_error_msg.lower() or "503" in last_error_msg:
-            return "⚠️ Gemini is temporarily unreachable. Please try again in a moment."
-        if "429" in last_error_msg or "quota" in last_error_msg.lower() or "resource exhausted" in last_error_msg.lower():
-            return "⚠️ Gemini API quota exceeded. Please try again later or upgrade your plan."
-        return "⚠️ Gemini service error. Please try again shortly."
+                time.sleep(wait)
+                continue
+            api_key, model_name = target
+            try:
+                model = self._registry.model(api_key, model_name, self._config)
+                result = call(model)
+            except Exception as e:
+                last_error_msg = str(e)
+                action, value = self._on_error(api_key, model_name, e)
+                if action == "fail":
+                    return None, value
+                if action == "retry":
+                    delay = self._retry_policy.backoff(retries)
+                    retries += 1
+                    if time.monotonic() + delay >= deadline:
+                        break
+                    time.sleep(delay)
+                continue
+            self._record_success(api_key, model_name)
+            return result, ""
+        return None, _final_error(last_error_msg or self._last_known_error())
+
+    def _candidate_models(self) -> List[str]:
+        # dict.fromkeys: the configured model is often one of the fallbacks
+        return list(dict.fromkeys([self._config.model_name, "gemini-2.0-flash-lite", "gemini-2.0-flash-exp"]))
+
+    def _next_model(self, api_key: str) -> Optional[str]:
+        """First model in the chain that is available and whose circuit lets a call through."""
+        for model_name in self._availability.candidates(api_key, self._candidate_models()):
+            if self._availability.acquire(api_key, model_name):
+                return model_name
+        return None
+
+    def _next_target(self) -> Tuple[Optional[Tuple[str, str]], float]:
+        """``((api_key, model_name), 0)`` for the next attempt.
+
+        ``(None, seconds)`` when every pooled key is cooling down or out of
+        budget and one frees up after ``seconds``; ``(None, 0)`` when there
+        is nothing left to try.
+        """
+        if self._key_pool is None:
+            model_name = self._next_model(self._api_key)
+            return ((self._api_key, model_name) if model_name else None), 0.0
+        # Keys with no usable model would spend budget on nothing
+        unusable = {
+            api_key for api_key in self._key_pool.keys
+            if not self._availability.candidates(api_key, self._candidate_models())
+        }
+        if len(unusable) == len(self._key_pool.keys):
+            return None, 0.0
+        tried = set()
+        while True:
+            api_key = self._key_pool.acquire(exclude=unusable | tried)
+            if api_key is None:
+                return None, (0.0 if tried else self._key_pool.wait_seconds(exclude=unusable))
+            model_name = self._next_model(api_key)
+            if model_name is not None:
+                return (api_key, model_name), 0.0
+            # Every circuit refused this key's call; give its budget back and try another key
+            self._key_pool.refund(api_key)
+            tried.add(api_key)
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self._key_pool.keys if self._key_pool is not None else (self._api_key,)
+
+    def _last_known_error(self) -> str:
+        # Nothing was attempted this call: explain with what the registry remembers
+        for api_key in self._keys():
+            error = self._availability.last_error(api_key, self._candidate_models())
+            if error:
+                return error
+        return ""
+
+    def _record_success(self, api_key: str, model_name: str) -> None:
+        self._availability.record_success(api_key, model_name)
+        if self._key_pool is not None:
+            self._key_pool.report_success(api_key)
+
+    def _on_error(self, api_key: str, model_name: str, error: Exception) -> Tuple[str, Any]:
+        """Record a failed attempt and decide what follows.
+
+        Returns ``("retry", None)`` to back off before the next attempt,
+        ``("next", None)`` to move on at once, or ``("fail", message)`` to stop
+        with a user-facing error.
+        """
+        logger.error(f"Gemini generation failed for model {model_name}", exc_info=error)
+        error_msg = str(error)
+        lower = error_msg.lower()
+
+        # Log the exact error for debugging
+        logger.error(f"Error details: {error_msg}")
+
+        if "404" in error_msg or "not found" in lower:
+            self._availability.record_unavailable(api_key, model_name, error_msg)
+            return "next", None
+        if ("permission" in lower or "forbidden" in lower or "unauthorized" in lower or "invalid api key" in lower or "401" in error_msg):
+            self._availability.record_unavailable(api_key, model_name, error_msg)
+            if self._key_pool is not None:
+                # One bad key in the pool shouldn't fail the request
+                self._key_pool.report_error(api_key)
+                return "next", None
+            return "fail", "⚠️ Gemini API permission denied. Please check your API key."
+        # 429, 503, timeouts and unknown errors: retry; the circuit decides when to give up on the model
+        self._availability.record_failure(api_key, model_name, error_msg)
+        if "429" in error_msg or "quota" in lower or "resource exhausted" in lower:
+            if self._key_pool is not None:
+                self._key_pool.report_rate_limited(api_key)
+                return "next", None
+            logger.info(f"Quota exceeded for {model_name}, backing off...")
+        elif self._key_pool is not None:
+            self._key_pool.report_error(api_key)
+        return "retry", None
+
+
+def _final_error(last_error_msg: str) -> str:
+    """User-facing message once every model has failed, based on the last error."""
+    if "404" in last_error_msg or "not found" in last_error_msg.lower():
+        return "⚠️ Gemini model not available. Falling back failed. Please set a supported model."
+    if ("permission" in last_error_msg.lower() or "forbidden" in last_error_msg.lower() or "unauthorized" in last_error_msg.lower() or "invalid api key" in last_error_msg.lower() or "401" in last_error_msg):
+        return "⚠️ Gemini API permission denied. Please check your API key."
+    if "timeout" in last_error_msg.lower() or "failed to connect" in last_error_msg.lower() or "503" in last_error_msg:
+        return "⚠️ Gemini is temporarily unreachable. Please try again in a moment."
+    if "429" in last_error_msg or "quota" in last_error_msg.lower() or "resource exhausted" in last_error_msg.lower():
+        return "⚠️ Gemini API quota exceeded. Please try again later or upgrade your plan."
+    return "⚠️ Gemini service error. Please try again shortly."
+
+
+_semaphore_lock = threading.Lock()
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _semaphore() -> asyncio.Semaphore:
+    """The running event loop's concurrency limit for async Gemini calls."""
+    loop = asyncio.get_running_loop()
+    with _semaphore_lock:
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(get_settings().gemini_max_concurrency)
+            _semaphores[loop] = semaphore
+        return semaphore
+
+
+def _response_text(response) -> str:
+    text = getattr(response, "text", None)
+    if isinstance(text, str) and text.strip():
+        return text.strip()
+    try:
+        candidates = getattr(response, "candidates", None)
+        if candidates:
+            return str(candidates[0]).strip()
+    except Exception:
+        logger.exception("Gemini response parsing failed")
+    return _UNPARSEABLE
+
+
+def _chunk_text(chunk) -> str:
+    # `.text` raises on chunks without text parts (e.g. a final safety/finish chunk)
+    try:
+        text = chunk.text
+    except (ValueError, AttributeError):
+        return ""
+    return text if isinstance(text, str) else ""
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config.settings import get_settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class HttpTransport:
+    """Pooled keep-alive HTTP transport with one Session per provider host.
+
+    At most ``pool_maxsize`` requests per host are in flight. A request that
+    finds them all busy waits no longer than its connect timeout and then
+    raises ``requests.ConnectTimeout``, so callers' deadlines still hold.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        pool_maxsize: int = 10,
+        user_agent: str = "SamvaadGPT/1.0",
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_maxsize = pool_maxsize
+        self.user_agent = user_agent
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+
+    def session_for(self, url: str) -> requests.Session:
+        return self._host(url)[0]
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> requests.Response:
+        """GET through the host's pooled session; ``timeout`` caps the pool wait and both timeouts."""
+        session, slots = self._host(url)
+        connect_timeout, read_timeout = self._timeout(timeout)
+        if not slots.acquire(timeout=connect_timeout):
+            raise requests.ConnectTimeout(f"No free connection to {urlsplit(url).netloc} within {connect_timeout}s")
+        try:
+            return session.get(url, params=params, timeout=(connect_timeout, read_timeout))
+        finally:
+            slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._slots.clear()
+
+    def _host(self, url: str) -> Tuple[requests.Session, threading.BoundedSemaphore]:
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._new_session()
+                self._sessions[host] = session
+                self._slots[host] = threading.BoundedSemaphore(self.pool_maxsize)
+                logger.info(f"Opened pooled HTTP session for {host} (maxsize={self.pool_maxsize})")
+            return session, self._slots[host]
+
+    def _timeout(self, budget: Optional[float]) -> Tuple[float, float]:
+        if budget is None:
+            return (self.connect_timeout, self.read_timeout)
+        budget = max(budget, 0.1)
+        return (min(self.connect_timeout, budget), min(self.read_timeout, budget))
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        # pool_block caps concurrent connections per host instead of opening extras;
+        # get() takes a slot first, so the pool itself never has to wait
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=True,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": self.user_agent,
+        })
+        return session
+
+
+_lock = threading.Lock()
+_transport: HttpTransport | None = None
+
+
+def get_transport() -> HttpTransport:
+    """Return the process-wide HTTP transport shared by news providers."""
+    global _transport
+    with _lock:
+        if _transport is None:
+            settings = get_settings()
+            _transport = HttpTransport(
+                connect_timeout=settings.http_connect_timeout_seconds,
+                read_timeout=settings.http_read_timeout_seconds,
+                pool_maxsize=settings.http_pool_maxsize,
+            )
+        return _transport
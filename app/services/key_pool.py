@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence
+
+from app.config.settings import get_settings
+from app.services.model_availability import key_id
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _KeyState:
+    __slots__ = ("tokens", "refilled_at", "last_used", "cooldown_until", "requests", "successes", "rate_limited", "errors")
+
+    def __init__(self, capacity: float):
+        now = time.monotonic()
+        self.tokens = capacity
+        self.refilled_at = now
+        self.last_used = 0.0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.successes = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+
+class ApiKeyPool:
+    """Spreads Gemini requests over several API keys.
+
+    Each key has a per-minute request budget (a token bucket). ``acquire``
+    picks the key with the most budget left, least recently used first, so
+    load rotates evenly; a key that gets a 429 sits out ``cooldown_seconds``.
+    """
+
+    def __init__(self, keys: Sequence[str], requests_per_minute: float = 15, cooldown_seconds: float = 60):
+        self.keys = tuple(dict.fromkeys(k for k in keys if k))
+        self.requests_per_minute = requests_per_minute
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._states: Dict[str, _KeyState] = {key: _KeyState(requests_per_minute) for key in self.keys}
+
+    def acquire(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """Take one request of budget from the best available key; None if every key is spent or cooling down."""
+        excluded = set(exclude)
+        now = time.monotonic()
+        with self._lock:
+            ready = []
+            for key in self.keys:
+                state = self._refill(key, now)
+                if key in excluded or state.cooldown_until > now or state.tokens < 1:
+                    continue
+                ready.append(key)
+            if not ready:
+                return None
+            key = min(ready, key=lambda k: (-int(self._states[k].tokens), self._states[k].last_used))
+            state = self._states[key]
+            state.tokens -= 1
+            state.last_used = now
+            state.requests += 1
+            return key
+
+    def refund(self, key: str) -> None:
+        """Give back a request acquired but never sent."""
+        with self._lock:
+            state = self._refill(key, time.monotonic())
+            state.tokens = min(self.requests_per_minute, state.tokens + 1)
+            state.requests -= 1
+
+    def wait_seconds(self, exclude: Iterable[str] = ()) -> float:
+        """Seconds until some key (other than ``exclude``) can be acquired again."""
+        excluded = set(exclude)
+        now = time.monotonic()
+        with self._lock:
+            waits = []
+            for key in self.keys:
+                if key in excluded:
+                    continue
+                state = self._refill(key, now)
+                refill_wait = max(0.0, (1 - state.tokens) * 60 / self.requests_per_minute)
+                waits.append(max(state.cooldown_until - now, refill_wait))
+            return max(0.0, min(waits)) if waits else 0.0
+
+    def report_success(self, key: str) -> None:
+        with self._lock:
+            self._states[key].successes += 1
+
+    def report_rate_limited(self, key: str) -> None:
+        """The key got a 429: cool it down and empty its budget."""
+        with self._lock:
+            state = self._states[key]
+            state.rate_limited += 1
+            state.tokens = 0.0
+            state.cooldown_until = time.monotonic() + self.cooldown_seconds
+        logger.warning(f"Gemini key {key_id(key)} rate limited; cooling down for {self.cooldown_seconds:.0f}s")
+
+    def report_error(self, key: str) -> None:
+        with self._lock:
+            self._states[key].errors += 1
+
+    def usage(self) -> Dict[str, Dict[str, float]]:
+        """Per-key counters, keyed by a short key label rather than the key itself."""
+        now = time.monotonic()
+        with self._lock:
+            report = {}
+            for key in self.keys:
+                state = self._refill(key, now)
+                report[key_id(key)] = {
+                    "requests": state.requests,
+                    "successes": state.successes,
+                    "rate_limited": state.rate_limited,
+                    "errors": state.errors,
+                    "budget": round(state.tokens, 1),
+                    "cooldown_seconds": round(max(0.0, state.cooldown_until - now), 1),
+                }
+            return report
+
+    def _refill(self, key: str, now: float) -> _KeyState:
+        state = self._states[key]
+        elapsed = now - state.refilled_at
+        state.tokens = min(self.requests_per_minute, state.tokens + elapsed * self.requests_per_minute / 60)
+        state.refilled_at = now
+        return state
+
+
+_lock = threading.Lock()
+_pool: ApiKeyPool | None = None
+
+
+def get_key_pool() -> Optional[ApiKeyPool]:
+    """Return the process-wide key pool, or None when GOOGLE_API_KEYS is not set.
+
+    The pool is rebuilt when the configured key list changes.
+    """
+    global _pool
+    settings = get_settings()
+    keys = tuple(dict.fromkeys(settings.gemini_api_keys))
+    with _lock:
+        if not keys:
+            _pool = None
+        elif _pool is None or _pool.keys != keys:
+            _pool = ApiKeyPool(
+                keys,
+                requests_per_minute=settings.gemini_key_rpm,
+                cooldown_seconds=settings.gemini_key_cooldown_seconds,
+            )
+            logger.info(f"Gemini key pool with {len(keys)} keys")
+        return _pool
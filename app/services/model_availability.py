@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from app.config.settings import get_settings
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def key_id(api_key: str) -> str:
+    """Short, non-reversible label for an API key (safe to log and display)."""
+    return hashlib.blake2b(api_key.encode("utf-8"), digest_size=4).hexdigest()
+
+
+class ModelAvailability:
+    """Which Gemini models are usable, per API key.
+
+    404 and permission failures are negatively cached for ``unavailable_ttl``
+    seconds, so a missing model costs one round trip per TTL instead of one
+    per request. 429/503/timeouts feed a per-model circuit breaker.
+    """
+
+    def __init__(self, unavailable_ttl: float = 3600, failure_threshold: int = 3, cooldown_seconds: float = 60):
+        self.unavailable_ttl = unavailable_ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        # (key id, model) -> (unavailable until, error message)
+        self._unavailable: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._last_errors: Dict[Tuple[str, str], str] = {}
+
+    def candidates(self, api_key: str, models: Sequence[str]) -> List[str]:
+        """``models`` without repeats, minus unavailable ones and those with an open circuit."""
+        kid = key_id(api_key)
+        now = time.monotonic()
+        result = []
+        with self._lock:
+            for model in dict.fromkeys(models):
+                until = self._unavailable.get((kid, model))
+                if until is not None and until[0] > now:
+                    continue
+                breaker = self._breakers.get((kid, model))
+                if breaker is not None and breaker.state == CircuitBreaker.OPEN:
+                    continue
+                result.append(model)
+        return result
+
+    def acquire(self, api_key: str, model: str) -> bool:
+        """True if a call to ``model`` may go now (claims the probe of a half-open circuit)."""
+        return self._breaker(api_key, model).allow_request()
+
+    def record_success(self, api_key: str, model: str) -> None:
+        self._breaker(api_key, model).record_success()
+
+    def record_failure(self, api_key: str, model: str, error: str) -> None:
+        """Transient failure (429/503/timeout): counts towards opening the circuit."""
+        breaker = self._breaker(api_key, model)
+        breaker.record_failure()
+        with self._lock:
+            self._last_errors[(key_id(api_key), model)] = error
+        if breaker.state == CircuitBreaker.OPEN:
+            logger.warning(f"Circuit opened for Gemini model {model}")
+
+    def record_unavailable(self, api_key: str, model: str, error: str) -> None:
+        """Permanent failure (404/permission): skip the model until the TTL passes."""
+        kid = key_id(api_key)
+        with self._lock:
+            self._unavailable[(kid, model)] = (time.monotonic() + self.unavailable_ttl, error)
+            self._last_errors[(kid, model)] = error
+        logger.warning(f"Gemini model {model} marked unavailable for {self.unavailable_ttl:.0f}s: {error[:120]}")
+
+    def last_error(self, api_key: str, models: Sequence[str]) -> str:
+        """Most relevant recorded error for ``models`` (first model with one)."""
+        kid = key_id(api_key)
+        with self._lock:
+            for model in models:
+                error = self._last_errors.get((kid, model))
+                if error:
+                    return error
+        return ""
+
+    def snapshot(self) -> Dict[str, Dict[str, str]]:
+        now = time.monotonic()
+        with self._lock:
+            states: Dict[str, Dict[str, str]] = {}
+            for (kid, model), breaker in self._breakers.items():
+                states.setdefault(kid, {})[model] = breaker.state
+            for (kid, model), (until, _) in self._unavailable.items():
+                if until > now:
+                    states.setdefault(kid, {})[model] = "unavailable"
+            return states
+
+    def _breaker(self, api_key: str, model: str) -> CircuitBreaker:
+        with self._lock:
+            key = (key_id(api_key), model)
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    failure_threshold=self.failure_threshold,
+                    cooldown_seconds=self.cooldown_seconds,
+                )
+                self._breakers[key] = breaker
+            return breaker
+
+
+_lock = threading.Lock()
+_availability: ModelAvailability | None = None
+
+
+def get_model_availability() -> ModelAvailability:
+    """Return the process-wide model availability registry, creating it on first use."""
+    global _availability
+    with _lock:
+        if _availability is None:
+            settings = get_settings()
+            _availability = ModelAvailability(
+                unavailable_ttl=settings.gemini_unavailable_ttl_seconds,
+                failure_threshold=settings.gemini_failure_threshold,
+                cooldown_seconds=settings.gemini_cooldown_seconds,
+            )
+        return _availability
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.config.settings import get_settings
+from app.services.article import Article
+from app.services.gemini_client import GeminiGenerationConfig
+from app.services.query_planner import plan_subqueries
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_ANALYTICAL_RE = re.compile(
+    r"\b(why|analy[sz]e|analysis|explain|impact|implications?|consequences?|pros and cons|"
+    r"trends?|outlook|predict|background|in depth|detailed|timeline)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    tier: str  # "light" or "heavy"
+    config: GeminiGenerationConfig
+    score: int
+    reasons: Tuple[str, ...]
+
+
+class ModelRouter:
+    """Picks a model and output cap per request from how demanding it looks.
+
+    Signals: comparative or analytical query, query length, number of
+    articles, history length, and whether it is a follow-up. A score of
+    ``heavy_threshold`` or more goes to the full model, anything lighter to
+    the lite model with a smaller output cap. When both tiers name the
+    same model there is nothing to trade, so every turn gets the full cap.
+    """
+
+    def __init__(
+        self,
+        light_model: str,
+        heavy_model: str,
+        light_max_output_tokens: int = 500,
+        heavy_max_output_tokens: int = 1500,
+        heavy_threshold: int = 2,
+        many_articles: int = 5,
+        long_history: int = 5,
+        long_query_words: int = 15,
+    ):
+        self.light_model = light_model
+        self.heavy_model = heavy_model
+        self.light_max_output_tokens = light_max_output_tokens
+        self.heavy_max_output_tokens = heavy_max_output_tokens
+        self.heavy_threshold = heavy_threshold
+        self.many_articles = many_articles
+        self.long_history = long_history
+        self.long_query_words = long_query_words
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {"light": 0, "heavy": 0}
+        # tier -> [answers, sum of first-token seconds, sum of total seconds]
+        self._latency: Dict[str, list] = {"light": [0, 0.0, 0.0], "heavy": [0, 0.0, 0.0]}
+
+    def route(
+        self,
+        *,
+        query: str,
+        history: Sequence[Dict[str, str]],
+        articles: Sequence[Article],
+        follow_up: bool,
+        temperature: float = 0.7,
+    ) -> RouteDecision:
+        score, reasons = self._score(query, history, articles, follow_up)
+        tier = "heavy" if score >= self.heavy_threshold else "light"
+        if self.light_model == self.heavy_model:
+            tier, reasons = "heavy", reasons + ("same_model",)
+        if tier == "heavy":
+            config = GeminiGenerationConfig(self.heavy_model, self.heavy_max_output_tokens, temperature)
+        else:
+            config = GeminiGenerationConfig(self.light_model, self.light_max_output_tokens, temperature)
+        with self._lock:
+            self._counts[tier] += 1
+        logger.info(
+            f"Model route: tier={tier} model={config.model_name} max_tokens={config.max_output_tokens} "
+            f"score={score} reasons={','.join(reasons) or '-'} articles={len(articles)} history={len(history)}"
+        )
+        return RouteDecision(tier=tier, config=config, score=score, reasons=reasons)
+
+    def _score(
+        self,
+        query: str,
+        history: Sequence[Dict[str, str]],
+        articles: Sequence[Article],
+        follow_up: bool,
+    ) -> Tuple[int, Tuple[str, ...]]:
+        score, reasons = 0, []
+        words = len(query.split())
+        if len(plan_subqueries(query)) > 1:
+            score += 2
+            reasons.append("comparative")
+        if _ANALYTICAL_RE.search(query):
+            score += 1
+            reasons.append("analytical")
+        if words > self.long_query_words:
+            score += 1
+            reasons.append("long_query")
+        if len(articles) >= self.many_articles:
+            score += 1
+            reasons.append("many_articles")
+        if len(history) >= self.long_history:
+            score += 1
+            reasons.append("long_history")
+        if follow_up and words <= 6:
+            # "tell me more" style turns reuse context the answer already covered
+            score -= 1
+            reasons.append("short_follow_up")
+        return score, tuple(reasons)
+
+    def record_outcome(
+        self,
+        decision: RouteDecision,
+        first_token_seconds: Optional[float],
+        total_seconds: float,
+        chars: int,
+    ) -> None:
+        """Log how a routed generation went, for comparing tiers."""
+        with self._lock:
+            latency = self._latency[decision.tier]
+            latency[0] += 1
+            latency[1] += first_token_seconds or 0.0
+            latency[2] += total_seconds
+        logger.info(
+            f"Model route outcome: tier={decision.tier} model={decision.config.model_name} "
+            f"first_token={first_token_seconds}s total={total_seconds}s chars={chars}"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = {}
+            for tier, routed in self._counts.items():
+                answers, first_token, total = self._latency[tier]
+                stats[tier] = {
+                    "routed": routed,
+                    "answers": answers,
+                    "avg_first_token_seconds": round(first_token / answers, 3) if answers else 0.0,
+                    "avg_total_seconds": round(total / answers, 3) if answers else 0.0,
+                }
+            return stats
+
+
+_lock = threading.Lock()
+_router: ModelRouter | None = None
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide model router, creating it on first use."""
+    global _router
+    with _lock:
+        if _router is None:
+            settings = get_settings()
+            _router = ModelRouter(
+                light_model=settings.gemini_light_model,
+                heavy_model=settings.gemini_model,
+                light_max_output_tokens=settings.gemini_light_max_output_tokens,
+                heavy_max_output_tokens=settings.max_output_tokens,
+                heavy_threshold=settings.model_router_heavy_threshold,
+                many_articles=settings.model_router_many_articles,
+                long_history=settings.model_router_long_history,
+            )
+        return _router
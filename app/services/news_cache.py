@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Optional
+
+from cachetools import TTLCache
+
+from app.config.settings import get_settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    value: Any
+    stored_at: float
+    # Request parameters needed to refresh the entry in the background
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that reports capacity evictions and TTL expirations."""
+
+    def __init__(self, maxsize: int, ttl: float, owner: "SharedNewsCache"):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._owner = owner
+
+    def popitem(self):
+        item = super().popitem()
+        self._owner._evictions += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        if expired:
+            self._owner._expirations += len(expired)
+        return expired
+
+
+class SharedNewsCache:
+    """Thread-safe TTL cache for news results, shared by every session.
+
+    Entries stay fresh for ``ttl`` seconds and are then kept for another
+    ``stale_ttl`` seconds so they can be served while being revalidated.
+    """
+
+    def __init__(self, maxsize: int = 100, ttl: float = 900, stale_ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._cache = _CountingTTLCache(maxsize=maxsize, ttl=ttl + stale_ttl, owner=self)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the value if it is still fresh."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or not self._is_fresh(entry):
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry.value
+
+    def get_stale(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return an expired-but-retained entry, if any."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or self._is_fresh(entry):
+                return None
+            self._stale_hits += 1
+            return entry
+
+    def set(self, key: Hashable, value: Any, meta: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self._cache[key] = CacheEntry(value=value, stored_at=self._cache.timer(), meta=dict(meta or {}))
+
+    def _is_fresh(self, entry: CacheEntry) -> bool:
+        return self._cache.timer() - entry.stored_at < self.ttl
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._cache
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "stale_hits": self._stale_hits,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_lock = threading.Lock()
+_shared_cache: SharedNewsCache | None = None
+
+
+def get_shared_news_cache() -> SharedNewsCache:
+    """Return the process-wide news cache, creating it on first use."""
+    global _shared_cache
+    with _lock:
+        if _shared_cache is None:
+            settings = get_settings()
+            _shared_cache = SharedNewsCache(
+                maxsize=settings.news_cache_size,
+                ttl=settings.news_cache_ttl_seconds,
+                stale_ttl=settings.news_cache_stale_ttl_seconds,
+            )
+            logger.info(
+                f"Shared news cache created (maxsize={settings.news_cache_size}, "
+                f"ttl={settings.news_cache_ttl_seconds}s, "
+                f"stale_ttl={settings.news_cache_stale_ttl_seconds}s)"
+            )
+        return _shared_cache
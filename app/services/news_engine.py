@@ -1,31 +1,94 @@
 from __future__ import annotations
 
-import requests
+import threading
 import time
-from typing import List, Dict
+
+import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, List, Dict, Optional, Set
 from datetime import datetime, timedelta
-from cachetools import TTLCache
 
 from app.config.settings import get_settings
+from app.services.article import Article
+from app.services.article_store import ArticleStore, get_article_store, parse_timestamp
+from app.services.dedup import deduplicate_articles
+from app.services.http_transport import HttpTransport, get_transport
+from app.services.news_cache import CacheEntry, SharedNewsCache, get_shared_news_cache
+from app.services.provider_health import ProviderHealthRegistry, get_health_registry
+from app.services.query_normalizer import build_cache_key, canonicalize_query
+from app.services.query_planner import plan_subqueries
+from app.services.query_stats import QueryRequest, get_query_popularity
+from app.services.rate_limiter import ProviderRateLimiter, get_rate_limiter
+from app.services.retry_policy import RetryPolicy, RetryStats
 from app.utils.logger import get_logger
+from app.utils.singleflight import SingleFlight
 
 logger = get_logger(__name__)
 
+
+class NewsProviderError(Exception):
+    """Retryable provider failure (rate limited or server error)."""
+
+
+_executor_lock = threading.Lock()
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+# Cache keys with a background refresh in flight (at most one per key), and
+# when a key whose last refresh brought nothing new may be refreshed again
+_refresh_lock = threading.Lock()
+_refreshing: Set[str] = set()
+_refresh_retry_at: Dict[str, float] = {}
+_REFRESH_RETRY_SECONDS = 60
+
+# Concurrent cache misses for the same key share one provider round trip
+_inflight = SingleFlight()
+
+
+def _get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Return a process-wide thread pool, creating it on first use."""
+    with _executor_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"news-{name}")
+            _executors[name] = executor
+        return executor
+
+
 class AdvancedNewsEngine:
 
-    def __init__(self):
-        settings = get_settings()
-        
+    def __init__(
+        self,
+        cache: Optional[SharedNewsCache] = None,
+        transport: Optional[HttpTransport] = None,
+        article_store: Optional[ArticleStore] = None,
+        rate_limiter: Optional[ProviderRateLimiter] = None,
+        health: Optional[ProviderHealthRegistry] = None,
+    ):
         self.gnews_url = "https://gnews.io/api/v4/search"
         self.newsapi_url = "https://newsapi.org/v2/everything"
+        self.newsdata_url = "https://newsdata.io/api/1/latest"
 
-        # Caches: 100 queries, expires in 15 minutes
-        self.cache = TTLCache(maxsize=100, ttl=900)
+        # Process-wide cache shared by every session and rerun
+        self.cache = cache if cache is not None else get_shared_news_cache()
+        # Keep-alive connection pools shared across engines
+        self.transport = transport if transport is not None else get_transport()
+        # Corpus of every article fetched so far, searchable without API calls
+        self.article_store = article_store if article_store is not None else get_article_store()
 
-        self.rate_tracker = {
-            "gnews_calls": 0,
-            "newsapi_calls": 0
-        }
+        settings = get_settings()
+        self.retry_policy = RetryPolicy(
+            max_attempts=settings.news_retry_attempts,
+            budget_seconds=settings.news_retry_budget_seconds,
+            base_delay=settings.news_retry_base_delay_seconds,
+            timeout_exceptions=(requests.Timeout, TimeoutError),
+        )
+        # Retry/timeout counts of the most recent call, per provider
+        self.last_retry_stats: Dict[str, RetryStats] = {}
+
+        # Persistent per-provider quota buckets, shared across engines and restarts
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        # Latency/error tracking and circuit breakers that drive provider order
+        self.health = health if health is not None else get_health_registry()
 
     
     # MAIN PUBLIC METHOD
@@ -37,9 +100,97 @@ class AdvancedNewsEngine:
         country: str = "in",
         breaking: bool = False,
         limit: int = 5
-    ) -> List[Dict]:
+    ) -> List[Article]:
         """Fetch news with intelligent API switching for real-time coverage."""
-        
+
+        # Cache key from the canonical query, so rephrasings share one entry
+        cache_key = self._cache_key(query, country, breaking, limit)
+        # Popular keys are what the prefetch scheduler keeps warm
+        get_query_popularity().record(cache_key, QueryRequest(query, country, breaking, limit))
+        return self._get_news(cache_key, query, country, breaking, limit)
+
+    def fetch_planned(
+        self,
+        query: str,
+        country: str = "in",
+        breaking: bool = False,
+        limit: int = 5
+    ) -> List[Article]:
+        """Fetch news, splitting comparative questions into parallel per-entity searches.
+
+        "compare India and US inflation" runs one ``fetch_news`` per side at
+        the same time and interleaves the results round-robin, so each side
+        is represented and latency stays close to the slowest single search.
+        """
+        settings = get_settings()
+        subqueries = plan_subqueries(query, settings.news_planner_max_subqueries) if settings.news_planner_enabled else [query]
+        if len(subqueries) == 1:
+            return self.fetch_news(query, country, breaking, limit)
+
+        logger.info(f"Planned sub-queries for {query}: {subqueries}")
+        executor = _get_executor("planner", settings.news_fanout_workers)
+        futures = {
+            executor.submit(self.fetch_news, subquery, country, breaking, limit): subquery
+            for subquery in subqueries
+        }
+        done, pending = wait(futures, timeout=settings.news_planner_deadline_seconds)
+        self._drop_stragglers(pending, futures)
+
+        results: Dict[str, List[Article]] = {}
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                logger.error(f"Sub-query failed for {futures[future]}: {e}")
+        # Every side gets at least one slot, even past `limit`
+        return self._merge_results(
+            [results.get(subquery, []) for subquery in subqueries],
+            max(limit, len(subqueries)),
+        )
+
+    def warm(self, query: str, country: str = "in", breaking: bool = False, limit: int = 5) -> bool:
+        """Prefetch a query into the cache; False if it was already fresh or budget is short.
+
+        Unlike ``fetch_news`` this is not counted as traffic, and it only
+        calls providers that are above their reserve.
+        """
+        cache_key = self._cache_key(query, country, breaking, limit)
+        if self.cache.get(cache_key) is not None:
+            return False
+        if not self.has_background_budget():
+            logger.info(f"Skipping prefetch for {query}: provider budget at reserve")
+            return False
+        self._get_news(cache_key, query, country, breaking, limit, background=True)
+        return True
+
+    def has_background_budget(self) -> bool:
+        """True if a configured provider can take a call and still keep its reserve.
+
+        Background work (prefetch, watch polls) leaves NEWS_BACKGROUND_RESERVE_FRACTION
+        of every per-minute and per-day bucket for user requests.
+        """
+        return any(
+            self._has_budget(name, background=True)
+            for name in self._provider_fetchers()
+            if self._is_configured(name)
+        )
+
+    def _has_budget(self, provider: str, background: bool) -> bool:
+        if background:
+            return self.rate_limiter.has_spare_budget(provider, get_settings().news_background_reserve_fraction)
+        return self.rate_limiter.has_budget(provider)
+
+    def _get_news(
+        self,
+        cache_key: str,
+        query: str,
+        country: str,
+        breaking: bool,
+        limit: int,
+        background: bool = False,
+    ) -> List[Article]:
+        topic = query
+
         # Smart Query Enhancement
         query = self._enhance_query(query, breaking)
         
@@ -47,48 +198,325 @@ class AdvancedNewsEngine:
         from_date = self._get_date_filter(breaking)
         
         # Cache Check
-        cache_key = f"{query}_{country}_{breaking}"
-        if cache_key in self.cache:
+        cached = self.cache.get(cache_key)
+        if cached is not None:
             logger.info(f"Cache hit for query: {query}")
-            return self.cache[cache_key]
+            return cached
+
+        # Stale-while-revalidate: answer now, refresh in the background
+        stale = self.cache.get_stale(cache_key)
+        if stale is not None:
+            logger.info(f"Serving stale cache entry for query: {query}")
+            self._schedule_refresh(cache_key, stale, background)
+            return stale.value
+
+        # Coalesce concurrent misses: one caller fetches, the rest share its result
+        articles = _inflight.do(
+            cache_key,
+            lambda: self._fetch_and_cache(cache_key, topic, query, country, from_date, breaking, limit, background),
+            timeout=get_settings().news_singleflight_timeout_seconds,
+        )
+        return list(articles)
 
-        articles = []
-        
-        # For recent/breaking news: Try NewsAPI first (better real-time coverage)
-        if breaking:
-            articles = self._retry_fetch(
-                lambda: self._fetch_newsapi(query, country, from_date, limit)
+    def _fetch_and_cache(
+        self,
+        cache_key: str,
+        topic: str,
+        query: str,
+        country: str,
+        from_date: str,
+        breaking: bool,
+        limit: int,
+        background: bool = False,
+    ) -> List[Article]:
+        # A leader that just finished may have filled the cache while we queued
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        meta = {"query": query, "country": country, "breaking": breaking, "limit": limit}
+
+        # Local corpus: answer overlapping topics without an API call
+        local = self._search_local(topic, country, from_date, limit)
+        if local:
+            logger.info(f"Article store answered query: {topic} ({len(local)} articles)")
+            self.cache.set(cache_key, local, meta=meta)
+            return local
+
+        articles = self._fetch_from_providers(
+            query, country, from_date, self._fetch_limit(limit), breaking, background
+        )
+        if not articles:
+            logger.warning(f"No articles found for query: {query}")
+            return []
+
+        articles = self._postprocess(articles, limit)
+        self.cache.set(cache_key, articles, meta=meta)
+        return articles
+
+    def _search_local(self, topic: str, country: str, from_date: str, limit: int) -> List[Article]:
+        """Articles from the local store, or [] unless enough fresh, relevant ones exist."""
+        settings = get_settings()
+        if not settings.article_store_enabled:
+            return []
+        hits = self.article_store.search(
+            topic,
+            limit=self._fetch_limit(limit),
+            since=parse_timestamp(from_date),
+            country=country,
+            min_score=settings.article_store_min_score,
+            min_relative_score=settings.article_store_min_relative_score,
+        )
+        hits = self._postprocess(hits, limit)
+        return hits if len(hits) >= limit else []
+
+    def _cache_key(self, query: str, country: str, breaking: bool, limit: int) -> str:
+        settings = get_settings()
+        return build_cache_key(
+            canonicalize_query(query),
+            country=country,
+            breaking=int(breaking),
+            limit=limit,
+            lang="en",
+            fanout=settings.news_fanout_mode,
+            dedup=int(settings.news_dedup_enabled),
+        )
+
+    def _fetch_limit(self, limit: int) -> int:
+        # Over-fetch so collapsing duplicates still leaves `limit` distinct stories
+        settings = get_settings()
+        return limit * settings.news_dedup_overfetch if settings.news_dedup_enabled else limit
+
+    def _postprocess(self, articles: List[Article], limit: int) -> List[Article]:
+        settings = get_settings()
+        if settings.news_dedup_enabled:
+            articles = deduplicate_articles(articles, min_similarity=settings.news_dedup_min_similarity)
+        return articles[:limit]
+
+    
+    # BACKGROUND REFRESH
+    
+
+    def _schedule_refresh(self, cache_key: str, entry: CacheEntry, background: bool = False) -> None:
+        with _refresh_lock:
+            if cache_key in _refreshing or time.monotonic() < _refresh_retry_at.get(cache_key, 0):
+                return
+            _refreshing.add(cache_key)
+        executor = _get_executor("refresh", get_settings().news_refresh_workers)
+        executor.submit(self._refresh_entry, cache_key, entry, background)
+
+    def _refresh_entry(self, cache_key: str, entry: CacheEntry, background: bool = False) -> None:
+        """Fetch only articles newer than the cached watermark and merge them in.
+
+        The entry is only re-saved (and so made fresh) when new articles
+        arrived; otherwise it keeps its age and the key waits
+        ``_REFRESH_RETRY_SECONDS`` before the next attempt.
+        """
+        refreshed = False
+        try:
+            meta = entry.meta
+            query, country = meta["query"], meta["country"]
+            breaking, limit = meta["breaking"], meta["limit"]
+
+            watermark = _newest_published(entry.value)
+            from_date = watermark or self._get_date_filter(breaking)
+            fresh = self._fetch_from_providers(
+                query, country, from_date, self._fetch_limit(limit), breaking, background
             )
-            if articles:
-                logger.info(f"NewsAPI success for breaking news: {query}")
-                self.cache[cache_key] = articles
-                return articles
-        
-        # For regular news: Try GNews first (better quality)
-        articles = self._retry_fetch(
-            lambda: self._fetch_gnews(query, country, from_date, limit)
+            # Providers treat `from` as inclusive, so drop anything not strictly newer
+            newer = [a for a in fresh if a.published_at > (watermark or "")]
+            if not newer:
+                logger.info(f"No new articles for stale cache entry: {query}")
+                return
+
+            articles = self._postprocess(newer + list(entry.value), limit)
+            self.cache.set(cache_key, articles, meta=meta)
+            refreshed = True
+            logger.info(f"Refreshed cache entry for query: {query} ({len(newer)} new articles)")
+        except Exception as e:
+            logger.error(f"Background refresh failed for {cache_key}: {e}")
+        finally:
+            now = time.monotonic()
+            with _refresh_lock:
+                _refreshing.discard(cache_key)
+                for key in [key for key, retry_at in _refresh_retry_at.items() if retry_at <= now]:
+                    del _refresh_retry_at[key]
+                if refreshed:
+                    _refresh_retry_at.pop(cache_key, None)
+                else:
+                    _refresh_retry_at[cache_key] = now + _REFRESH_RETRY_SECONDS
+
+    def fetch_since(
+        self,
+        query: str,
+        country: str = "in",
+        since: str = "",
+        limit: int = 5,
+        background: bool = False,
+    ) -> List[Article]:
+        """Uncached breaking-news fetch of articles published from ``since`` (ISO-8601) on."""
+        from_date = since or self._get_date_filter(True)
+        return self._fetch_from_providers(
+            self._enhance_query(query, True), country, from_date, self._fetch_limit(limit), True, background
         )
-        
-        if articles:
-            self.cache[cache_key] = articles
-            logger.info(f"GNews success for query: {query}")
-            return articles
 
-        # Fallback to NewsAPI
-        if not breaking:  # Already tried NewsAPI if breaking
+    def _fetch_from_providers(
+        self,
+        query: str,
+        country: str,
+        from_date: str,
+        limit: int,
+        breaking: bool,
+        background: bool = False,
+    ) -> List[Article]:
+        """Fetch from the usable providers; ``background`` calls leave every provider's reserve alone."""
+        settings = get_settings()
+        order = self._provider_order(breaking)
+        if not order:
+            if any(self._is_configured(name) for name in self._provider_fetchers()):
+                logger.warning("All news providers have an open circuit")
+            else:
+                logger.warning("No news provider API key is configured")
+            return []
+        # Skip providers whose quota is spent instead of paying for a 429
+        order = [name for name in order if self._has_budget(name, background)]
+        if not order:
+            if background:
+                logger.info("All news providers are at their background reserve")
+            else:
+                logger.warning("All news providers are out of rate budget")
+            return []
+
+        if settings.news_fanout_mode in ("first", "merge"):
+            return self._fetch_fanout(
+                order, query, country, from_date, limit,
+                mode=settings.news_fanout_mode,
+                deadline_seconds=settings.news_fanout_deadline_seconds,
+            )
+
+        # Sequential fallback in priority order
+        fetchers = self._provider_fetchers()
+        for name in order:
             articles = self._retry_fetch(
-                lambda: self._fetch_newsapi(query, country, from_date, limit)
+                lambda timeout, name=name: fetchers[name](query, country, from_date, limit, timeout=timeout),
+                provider=name,
             )
-            
             if articles:
-                self.cache[cache_key] = articles
-                logger.info(f"NewsAPI fallback success for query: {query}")
+                logger.info(f"{name} success for query: {query}")
                 return articles
-
-        logger.warning(f"No articles found for query: {query}")
         return []
 
     
+    # PROVIDER ROUTING
+    
+
+    def _provider_order(self, breaking: bool) -> List[str]:
+        """Configured providers whose circuit is not open, healthiest first."""
+        # Tie-break preference: NewsAPI/NewsData for real-time coverage, GNews for quality
+        if breaking:
+            preferred = ["newsapi", "newsdata", "gnews"]
+        else:
+            preferred = ["gnews", "newsapi", "newsdata"]
+        configured = [name for name in preferred if self._is_configured(name)]
+        return self.health.order(configured)
+
+    def _is_configured(self, provider: str) -> bool:
+        settings = get_settings()
+        keys = {
+            "gnews": settings.gnews_api_key,
+            "newsapi": settings.newsapi_key,
+            "newsdata": settings.newsdata_api_key,
+        }
+        return bool(keys.get(provider))
+
+    def _provider_fetchers(self) -> Dict[str, Callable[..., List[Article]]]:
+        return {
+            "gnews": self._fetch_gnews,
+            "newsapi": self._fetch_newsapi,
+            "newsdata": self._fetch_newsdata,
+        }
+
+    def _fetch_fanout(
+        self,
+        order: List[str],
+        query: str,
+        country: str,
+        from_date: str,
+        limit: int,
+        mode: str = "first",
+        deadline_seconds: float = 8.0,
+    ) -> List[Article]:
+        """Query all providers at once; return the first hit or a merge within the deadline."""
+        fetchers = self._provider_fetchers()
+        executor = _get_executor("fanout", get_settings().news_fanout_workers)
+        futures = {
+            executor.submit(
+                self._retry_fetch,
+                lambda timeout, name=name: fetchers[name](query, country, from_date, limit, timeout=timeout),
+                provider=name,
+                budget_seconds=min(deadline_seconds, self.retry_policy.budget_seconds),
+            ): name
+            for name in order
+        }
+
+        deadline = time.monotonic() + deadline_seconds
+        pending = set(futures)
+        results: Dict[str, List[Article]] = {}
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    articles = future.result()
+                except Exception as e:
+                    logger.warning(f"Fan-out fetch from {name} failed: {e}")
+                    continue
+                if not articles:
+                    continue
+                if mode == "first":
+                    self._drop_stragglers(pending, futures)
+                    logger.info(f"Fan-out: {name} answered first for query: {query}")
+                    return articles
+                results[name] = articles
+
+        self._drop_stragglers(pending, futures)
+
+        if not results:
+            return []
+        merged = self._merge_results([results[name] for name in order if name in results], limit)
+        logger.info(f"Fan-out: merged {len(merged)} articles from {list(results)} for query: {query}")
+        return merged
+
+    def _drop_stragglers(self, pending, futures) -> None:
+        # Running requests can't be interrupted; their results are simply ignored
+        for future in pending:
+            future.cancel()
+        if pending:
+            names = [futures[f] for f in pending]
+            logger.info(f"Ignoring stragglers {names}")
+
+    def _merge_results(self, result_sets: List[List[Article]], limit: int) -> List[Article]:
+        """Interleave provider results round-robin, dropping repeated URLs."""
+        merged: List[Article] = []
+        seen = set()
+        longest = max((len(r) for r in result_sets), default=0)
+        for i in range(longest):
+            for articles in result_sets:
+                if i >= len(articles):
+                    continue
+                article = articles[i]
+                url = article.url
+                if url and url in seen:
+                    continue
+                seen.add(url)
+                merged.append(article)
+        return merged[:limit]
+
+    
     # SMART QUERY ENHANCERS
    
 
@@ -113,25 +541,28 @@ class AdvancedNewsEngine:
     # RETRY LOGICS
    
 
-    def _retry_fetch(self, func, retries=2):
-        for attempt in range(retries):
-            try:
-                result = func()
-                if result:
-                    return result
-                if attempt < retries - 1:
-                    time.sleep(1)
-            except Exception as e:
-                logger.warning(f"Retry {attempt + 1} failed: {e}")
-                if attempt < retries - 1:
-                    time.sleep(1)
-        return []
+    def _retry_fetch(
+        self,
+        func: Callable[[float], List[Article]],
+        provider: str = "",
+        budget_seconds: Optional[float] = None,
+    ) -> List[Article]:
+        articles, stats = self.retry_policy.run(func, default=[], budget_seconds=budget_seconds)
+        self.last_retry_stats[provider] = stats
+        if stats.retries or stats.timeouts or stats.errors:
+            logger.warning(
+                f"{provider} fetch: attempts={stats.attempts} retries={stats.retries} "
+                f"timeouts={stats.timeouts} errors={stats.errors} "
+                f"budget_exhausted={stats.budget_exhausted} elapsed={stats.elapsed_seconds}s "
+                f"last_error={stats.last_error}"
+            )
+        return articles
 
     
     # GNEWS FETCH
     
 
-    def _fetch_gnews(self, query, country, from_date, limit):
+    def _fetch_gnews(self, query, country, from_date, limit, timeout=None):
         settings = get_settings()
         
         if not settings.gnews_api_key:
@@ -147,27 +578,22 @@ class AdvancedNewsEngine:
             "token": settings.gnews_api_key
         }
 
-        try:
-            response = requests.get(self.gnews_url, params=params, timeout=10)
-
-            if response.status_code != 200:
-                logger.warning(f"GNews API error: {response.status_code}")
-                return []
-
-            self.rate_tracker["gnews_calls"] += 1
+        response = self._request("gnews", self.gnews_url, params, timeout)
+        if response is None:
+            return []
 
+        try:
             data = response.json()
-            return self._format_articles(data.get("articles", []))
-
-        except Exception as e:
-            logger.error(f"GNews fetch error: {e}")
+        except ValueError as e:
+            logger.error(f"GNews returned invalid JSON: {e}")
             return []
+        return self._format_articles(data.get("articles", []), country)
 
     
     # NEWSAPI.IO FETCH
     
 
-    def _fetch_newsapi(self, query, country, from_date, limit):
+    def _fetch_newsapi(self, query, country, from_date, limit, timeout=None):
         settings = get_settings()
         
         if not settings.newsapi_key:
@@ -183,42 +609,146 @@ class AdvancedNewsEngine:
             "sortBy": "publishedAt"
         }
 
+        response = self._request("newsapi", self.newsapi_url, params, timeout)
+        if response is None:
+            return []
+
         try:
-            response = requests.get(self.newsapi_url, params=params, timeout=10)
+            data = response.json()
+        except ValueError as e:
+            logger.error(f"NewsAPI returned invalid JSON: {e}")
+            return []
+        return self._format_articles(data.get("articles", []), country)
 
-            if response.status_code != 200:
-                logger.warning(f"NewsAPI error: {response.status_code}")
-                return []
+    
+    # NEWSDATA.IO FETCH
+    
 
-            self.rate_tracker["newsapi_calls"] += 1
+    def _fetch_newsdata(self, query, country, from_date, limit, timeout=None):
+        settings = get_settings()
 
-            data = response.json()
-            return self._format_articles(data.get("articles", []))
+        if not settings.newsdata_api_key:
+            logger.warning("NewsData API key not configured")
+            return []
 
-        except Exception as e:
-            logger.error(f"NewsAPI fetch error: {e}")
+        params = {
+            "apikey": settings.newsdata_api_key,
+            "q": query,
+            "country": country,
+            "language": "en",
+            "size": min(limit, 10),  # Free plan caps page size at 10
+        }
+
+        response = self._request("newsdata", self.newsdata_url, params, timeout)
+        if response is None:
             return []
 
+        try:
+            data = response.json()
+        except ValueError as e:
+            logger.error(f"NewsData returned invalid JSON: {e}")
+            return []
+
+        articles = [self._normalize_newsdata(a) for a in data.get("results") or []]
+        # The latest endpoint has no date filter, so apply the window here
+        since = parse_timestamp(from_date)
+        if since is not None:
+            articles = [a for a in articles if (parse_timestamp(a["publishedAt"]) or since) >= since]
+        return self._format_articles(articles, country)
+
+    def _normalize_newsdata(self, a: Dict) -> Dict:
+        """Map a NewsData.io result onto the GNews/NewsAPI article shape."""
+        content = a.get("content") or ""
+        if content.upper().startswith("ONLY AVAILABLE"):
+            content = ""
+        pub_date = a.get("pubDate") or ""
+        if pub_date and "T" not in pub_date:
+            pub_date = pub_date.replace(" ", "T") + "Z"
+        return {
+            "title": a.get("title") or "",
+            "description": a.get("description") or "",
+            "content": content or a.get("description") or "",
+            "source": {"id": a.get("source_id") or "", "name": a.get("source_name") or a.get("source_id") or "Unknown"},
+            "publishedAt": pub_date,
+            "url": a.get("link") or "",
+        }
+
+    
+    # PROVIDER REQUEST
+    
+
+    def _request(self, provider: str, url: str, params: Dict, timeout: Optional[float]):
+        """Rate-limited, health-tracked GET. Returns None when skipped or not retryable."""
+        # Checked here, not when ordering, so a half-open probe goes to a provider that is really called
+        if not self.health.allow(provider):
+            logger.info(f"{provider} circuit is open; skipping")
+            return None
+        if not self.rate_limiter.try_acquire(provider):
+            return None
+
+        started = time.monotonic()
+        try:
+            # Transport errors propagate so the retry policy can tell them from empty results
+            response = self.transport.get(url, params=params, timeout=timeout)
+            ok = self._check_status(provider, response)
+        except Exception:
+            self.health.record(provider, time.monotonic() - started, ok=False)
+            raise
+        self.health.record(provider, time.monotonic() - started, ok=ok)
+        return response if ok else None
+
+    def _check_status(self, provider: str, response) -> bool:
+        """Raise for retryable HTTP statuses; other non-200s are logged and return False."""
+        if response.status_code == 200:
+            return True
+        if response.status_code == 429:
+            # Provider says we're over quota; stop routing to it until the bucket refills
+            self.rate_limiter.drain(provider, "minute")
+        if response.status_code == 429 or response.status_code >= 500:
+            raise NewsProviderError(f"{provider} HTTP {response.status_code}")
+        logger.warning(f"{provider} API error: {response.status_code}")
+        return False
+
     
     # FORMATTER
     
 
-    def _format_articles(self, articles):
-        """Format articles with complete source information for display."""
+    def _format_articles(self, articles: List[Dict], country: str = "") -> List[Article]:
+        """Convert raw provider articles into Article records; ``country`` is what they were fetched for."""
         formatted = []
 
         for a in articles:
-            article_data = {
-                "title": a.get("title", ""),
-                "description": a.get("description", ""),
-                "content": a.get("content", a.get("description", "")),  # Fallback to description
-                "source": a.get("source", {}).get("name", "Unknown") if isinstance(a.get("source"), dict) else a.get("source", "Unknown"),
-                "source_id": a.get("source", {}).get("id", ""),
-                "published_at": a.get("publishedAt", ""),
-                "pubDate": a.get("publishedAt", a.get("pubDate", "")),
-                "url": a.get("url", ""),
-                "link": a.get("url", a.get("link", ""))  # Support both url and link
-            }
-            formatted.append(article_data)
-
+            source = a.get("source")
+            if isinstance(source, dict):
+                source_name, source_id = source.get("name"), source.get("id")
+            else:
+                source_name, source_id = source, ""
+            formatted.append(Article(
+                title=a.get("title") or "",
+                description=a.get("description") or "",
+                content=a.get("content") or "",  # Article falls back to description
+                source=source_name or "Unknown",
+                source_id=source_id or "",
+                published_at=a.get("publishedAt") or a.get("pubDate") or "",
+                url=a.get("url") or a.get("link") or "",  # Support both url and link
+            ))
+
+        if get_settings().article_store_enabled:
+            self.article_store.add(formatted, country)
         return formatted
+
+
+def _newest_published(articles: List[Article]) -> str:
+    """Newest ``published_at`` as an ISO-8601 UTC string usable as a provider ``from``."""
+    newest = ""
+    for a in articles:
+        published = a.published_at
+        if published > newest:
+            newest = published
+    if not newest:
+        return ""
+    try:
+        parsed = datetime.fromisoformat(newest.replace("Z", "+00:00"))
+    except ValueError:
+        return ""
+    return parsed.strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+from app.config.settings import get_settings
+from app.services.article import Article
+from app.services.article_store import parse_timestamp
+from app.services.dedup import canonical_url, deduplicate_articles
+from app.services.news_engine import AdvancedNewsEngine
+from app.services.query_normalizer import build_cache_key, canonicalize_query
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Articles (and their URLs) kept per topic to deduplicate new arrivals against
+_RECENT_LIMIT = 200
+
+
+class WatchSubscription:
+    """One chat's view of a watched topic; new articles queue here until drained."""
+
+    def __init__(self, poller: "TopicPoller", max_batch: int):
+        self.poller = poller
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending: List[Article] = []
+        self.last_drained = time.monotonic()
+        self.closed = False
+
+    @property
+    def query(self) -> str:
+        return self.poller.query
+
+    @property
+    def country(self) -> str:
+        return self.poller.country
+
+    def push(self, articles: List[Article]) -> None:
+        with self._lock:
+            # Newest batch first; keep the most recent `max_batch`
+            self._pending = (articles + self._pending)[:self.max_batch]
+
+    def drain(self) -> List[Article]:
+        """New articles since the last drain, newest batch first."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self.last_drained = time.monotonic()
+        return pending
+
+    def close(self) -> None:
+        self.poller.unsubscribe(self)
+
+
+class TopicPoller:
+    """Polls providers for one breaking topic and fans new articles out to subscribers.
+
+    The ``from`` watermark rises to the newest article seen, and every
+    arrival is deduplicated against recent ones, so subscribers only get
+    stories they have not seen. Polls only spend quota the engine's
+    background reserve allows, and the wait doubles after every poll that
+    finds nothing new, up to ``max_interval_seconds``. The thread exits once
+    nobody is subscribed or every subscriber has gone idle (stopped draining).
+    """
+
+    def __init__(
+        self,
+        manager: "WatchManager",
+        key: str,
+        query: str,
+        country: str,
+        seed: Sequence[Article] = (),
+        engine_factory: Callable[[], AdvancedNewsEngine] = AdvancedNewsEngine,
+        interval_seconds: float = 60,
+        idle_seconds: float = 300,
+        limit: int = 5,
+        max_interval_seconds: float = 600,
+    ):
+        self.manager = manager
+        self.key = key
+        self.query = query
+        self.country = country
+        self.engine_factory = engine_factory
+        self.interval_seconds = interval_seconds
+        self.max_interval_seconds = max(interval_seconds, max_interval_seconds)
+        self.idle_seconds = idle_seconds
+        self.limit = limit
+        self.delay_seconds = interval_seconds
+        self.subscribers: List[WatchSubscription] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._recent: Deque[Article] = deque(maxlen=_RECENT_LIMIT)
+        # Insertion-ordered so the oldest URLs can be dropped
+        self._seen: Dict[str, None] = {}
+        self.watermark: Optional[float] = None
+        self.polls = 0
+        self._remember(list(seed))
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"news-watch-{self.query[:20]}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def unsubscribe(self, subscription: WatchSubscription) -> None:
+        self.manager._unsubscribe(self, subscription)
+
+    def poll_once(self) -> List[Article]:
+        """Fetch past the watermark and return the articles no subscriber has seen yet."""
+        engine = self.engine_factory()
+        if not engine.has_background_budget():
+            logger.info(f"Skipping watch poll for {self.query}: provider budget at reserve")
+            return []
+        fetched = engine.fetch_since(
+            self.query, self.country, since=self._since(), limit=self.limit, background=True
+        )
+        newer = [
+            article for article in fetched
+            if canonical_url(article.url) not in self._seen
+            and (self.watermark is None or (parse_timestamp(article.published_at) or 0) > self.watermark)
+        ]
+        self.polls += 1
+        if not newer:
+            return []
+
+        # Seen articles go first, so a new copy of a known story merges into it
+        settings = get_settings()
+        if settings.news_dedup_enabled:
+            merged = deduplicate_articles(list(self._recent) + newer, min_similarity=settings.news_dedup_min_similarity)
+        else:
+            merged = list(self._recent) + newer
+        fresh = [article for article in merged if canonical_url(article.url) not in self._seen]
+        self._remember(newer)
+        fresh.sort(key=lambda a: a.published_at, reverse=True)
+        return fresh
+
+    def _since(self) -> str:
+        if self.watermark is None:
+            return ""
+        return datetime.fromtimestamp(self.watermark, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def _remember(self, articles: List[Article]) -> None:
+        for article in articles:
+            self._recent.append(article)
+            self._seen[canonical_url(article.url)] = None
+            if len(self._seen) > _RECENT_LIMIT:
+                del self._seen[next(iter(self._seen))]
+            published = parse_timestamp(article.published_at)
+            if published is not None and (self.watermark is None or published > self.watermark):
+                self.watermark = published
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.delay_seconds):
+            if not self.manager._prune(self):
+                break
+            try:
+                fresh = self.poll_once()
+            except Exception as e:
+                logger.error(f"Watch poll failed for {self.query}: {e}")
+                fresh = []
+            if not fresh:
+                self.delay_seconds = min(self.delay_seconds * 2, self.max_interval_seconds)
+                continue
+            self.delay_seconds = self.interval_seconds
+            logger.info(f"Watch found {len(fresh)} new articles for {self.query}")
+            for subscription in self.manager._subscribers(self):
+                subscription.push(fresh)
+
+
+class WatchManager:
+    """Shares one poller per (canonical topic, country) among all watching chats."""
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], AdvancedNewsEngine] = AdvancedNewsEngine,
+        interval_seconds: float = 60,
+        idle_seconds: float = 300,
+        max_batch: int = 10,
+        limit: int = 5,
+        max_interval_seconds: float = 600,
+    ):
+        self.engine_factory = engine_factory
+        self.interval_seconds = interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.idle_seconds = idle_seconds
+        self.max_batch = max_batch
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._pollers: Dict[str, TopicPoller] = {}
+
+    def watch(self, query: str, country: str = "in", seed: Sequence[Article] = ()) -> WatchSubscription:
+        """Subscribe to new articles on ``query``; ``seed`` marks articles already shown."""
+        key = build_cache_key(canonicalize_query(query), country=country, watch=1)
+        with self._lock:
+            poller = self._pollers.get(key)
+            if poller is None:
+                poller = TopicPoller(
+                    self, key, query, country, seed=seed,
+                    engine_factory=self.engine_factory,
+                    interval_seconds=self.interval_seconds,
+                    idle_seconds=self.idle_seconds,
+                    limit=self.limit,
+                    max_interval_seconds=self.max_interval_seconds,
+                )
+                self._pollers[key] = poller
+                poller.start()
+                logger.info(f"Started watch poller for {query} ({country})")
+            subscription = WatchSubscription(poller, self.max_batch)
+            poller.subscribers.append(subscription)
+            return subscription
+
+    def active(self) -> Dict[str, int]:
+        """Subscriber count per watched topic."""
+        with self._lock:
+            return {poller.query: len(poller.subscribers) for poller in self._pollers.values()}
+
+    def stop_all(self) -> None:
+        with self._lock:
+            pollers = list(self._pollers.values())
+            self._pollers.clear()
+        for poller in pollers:
+            poller.stop()
+
+    def _unsubscribe(self, poller: TopicPoller, subscription: WatchSubscription) -> None:
+        with self._lock:
+            subscription.closed = True
+            if subscription in poller.subscribers:
+                poller.subscribers.remove(subscription)
+            self._retire_if_unused(poller)
+
+    def _subscribers(self, poller: TopicPoller) -> List[WatchSubscription]:
+        with self._lock:
+            return list(poller.subscribers)
+
+    def _prune(self, poller: TopicPoller) -> bool:
+        """Drop idle subscribers; False (and the poller is retired) if none remain."""
+        now = time.monotonic()
+        with self._lock:
+            for subscription in list(poller.subscribers):
+                if now - subscription.last_drained > poller.idle_seconds:
+                    subscription.closed = True
+                    poller.subscribers.remove(subscription)
+            return not self._retire_if_unused(poller)
+
+    def _retire_if_unused(self, poller: TopicPoller) -> bool:
+        # Called under self._lock, so no watch() can join a poller being retired
+        if poller.subscribers:
+            return False
+        if self._pollers.get(poller.key) is poller:
+            del self._pollers[poller.key]
+            logger.info(f"Stopped watch poller for {poller.query}")
+        poller.stop()
+        return True
+
+
+_lock = threading.Lock()
+_manager: WatchManager | None = None
+
+
+def get_watch_manager() -> WatchManager:
+    """Return the process-wide watch manager, creating it on first use."""
+    global _manager
+    with _lock:
+        if _manager is None:
+            settings = get_settings()
+            _manager = WatchManager(
+                interval_seconds=settings.news_watch_interval_seconds,
+                idle_seconds=settings.news_watch_idle_seconds,
+                max_batch=settings.news_watch_max_batch,
+                limit=settings.news_fetch_limit,
+                max_interval_seconds=settings.news_watch_max_interval_seconds,
+            )
+        return _manager
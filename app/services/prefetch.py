@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+from typing import Callable, List, Optional, Sequence
+
+from app.config.settings import get_settings
+from app.services.news_engine import AdvancedNewsEngine
+from app.services.query_stats import QueryPopularity, QueryRequest, get_query_popularity
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PrefetchScheduler:
+    """Background thread that keeps seed topics and popular queries warm in the news cache.
+
+    Each cycle warms every seed for each country/breaking combination, then
+    the ``top_n`` most requested queries as they were asked. Quota is left
+    to ``AdvancedNewsEngine.warm``, which stops spending at the reserve.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], AdvancedNewsEngine] = AdvancedNewsEngine,
+        popularity: Optional[QueryPopularity] = None,
+        seeds: Sequence[str] = (),
+        countries: Sequence[str] = ("in",),
+        interval_seconds: float = 600,
+        top_n: int = 5,
+        limit: int = 5,
+    ):
+        self.engine_factory = engine_factory
+        self.popularity = popularity if popularity is not None else get_query_popularity()
+        self.seeds = list(seeds)
+        self.countries = list(countries) or ["in"]
+        self.interval_seconds = interval_seconds
+        self.top_n = top_n
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.cycles = 0
+        self.warmed = 0
+
+    def start(self) -> None:
+        """Start the scheduler thread; a no-op if it is already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="news-prefetch", daemon=True)
+            self._thread.start()
+        logger.info(f"Prefetch scheduler started (every {self.interval_seconds}s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal the thread to stop after the query in progress and wait for it."""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def plan(self) -> List[QueryRequest]:
+        """Requests to warm this cycle: seeds first, then popular traffic, without repeats."""
+        requests = [
+            QueryRequest(seed, country, breaking, self.limit)
+            for seed in self.seeds
+            for country in self.countries
+            for breaking in (False, True)
+        ]
+        requests.extend(self.popularity.top(self.top_n))
+        return list(dict.fromkeys(requests))
+
+    def run_once(self) -> int:
+        """Warm every planned request once; returns how many were fetched."""
+        engine = self.engine_factory()
+        warmed = 0
+        for request in self.plan():
+            if self._stop.is_set():
+                break
+            try:
+                if engine.warm(request.query, request.country, request.breaking, request.limit):
+                    warmed += 1
+            except Exception as e:
+                logger.error(f"Prefetch failed for {request.query}: {e}")
+        self.cycles += 1
+        self.warmed += warmed
+        return warmed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            warmed = self.run_once()
+            if warmed:
+                logger.info(f"Prefetched {warmed} queries in {time.monotonic() - started:.1f}s")
+            self._stop.wait(self.interval_seconds)
+
+
+_lock = threading.Lock()
+_scheduler: PrefetchScheduler | None = None
+
+
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    """Return the process-wide prefetch scheduler, creating it on first use."""
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            settings = get_settings()
+            _scheduler = PrefetchScheduler(
+                seeds=settings.news_prefetch_seeds,
+                countries=settings.news_prefetch_countries,
+                interval_seconds=settings.news_prefetch_interval_seconds,
+                top_n=settings.news_prefetch_top_n,
+                limit=settings.news_fetch_limit,
+            )
+            atexit.register(_scheduler.stop)
+        return _scheduler
+
+
+def start_prefetch() -> None:
+    """Start the scheduler if NEWS_PREFETCH_ENABLED is set."""
+    if get_settings().news_prefetch_enabled:
+        get_prefetch_scheduler().start()
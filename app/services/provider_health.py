@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import get_settings
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProviderHealth:
+    """EWMA latency and error rate for one provider, plus its circuit breaker."""
+
+    def __init__(self, alpha: float, failure_threshold: int, cooldown_seconds: float):
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.updated_at = time.monotonic()
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, cooldown_seconds=cooldown_seconds)
+
+    def decayed(self, now: float, prior_latency: float, half_life: float) -> Tuple[float, float]:
+        """(latency, error_rate) drifted back toward the prior since the last call.
+
+        A provider that lost its rank gets no calls to prove it recovered,
+        so old evidence has to fade on its own.
+        """
+        weight = 0.5 ** (max(0.0, now - self.updated_at) / half_life) if half_life > 0 else 1.0
+        latency = self.latency if self.latency is not None else prior_latency
+        return prior_latency + (latency - prior_latency) * weight, self.error_rate * weight
+
+    def record(self, latency: float, ok: bool, prior_latency: float, half_life: float) -> None:
+        # Fold in the decay first, so a stale bad streak doesn't weigh on the new sample
+        now = time.monotonic()
+        if self.latency is not None:
+            self.latency, self.error_rate = self.decayed(now, prior_latency, half_life)
+        self.updated_at = now
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+        self.error_rate = self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * self.error_rate
+        self.samples += 1
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+
+class ProviderHealthRegistry:
+    """Tracks provider health and orders providers by it."""
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 60,
+        prior_latency: float = 1.0,
+        error_penalty: float = 4.0,
+        half_life_seconds: float = 120,
+        explore_rate: float = 0.05,
+    ):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.prior_latency = prior_latency
+        self.error_penalty = error_penalty
+        self.half_life_seconds = half_life_seconds
+        self.explore_rate = explore_rate
+        self._lock = threading.Lock()
+        self._providers: Dict[str, ProviderHealth] = {}
+
+    def record(self, provider: str, latency: float, ok: bool) -> None:
+        health = self._get(provider)
+        was_open = health.breaker.state != CircuitBreaker.CLOSED
+        with self._lock:
+            health.record(latency, ok, self.prior_latency, self.half_life_seconds)
+        state = health.breaker.state
+        if state == CircuitBreaker.OPEN and not was_open:
+            logger.warning(f"Circuit opened for {provider} (error_rate={health.error_rate:.2f})")
+        elif was_open and state == CircuitBreaker.CLOSED:
+            logger.info(f"Circuit closed for {provider}")
+
+    def order(self, providers: List[str]) -> List[str]:
+        """Providers whose circuit is not open, healthiest first (ties keep the given order).
+
+        Only reads breaker state; call ``allow`` for the provider actually tried.
+        With probability ``explore_rate`` a lower-ranked provider goes first,
+        so one that recovered gets the calls it needs to win its place back.
+        """
+        candidates = [name for name in providers if self._get(name).breaker.state != CircuitBreaker.OPEN]
+        ranked = sorted(candidates, key=self.score)
+        if len(ranked) > 1 and random.random() < self.explore_rate:
+            ranked.insert(0, ranked.pop(random.randrange(1, len(ranked))))
+        return ranked
+
+    def allow(self, provider: str) -> bool:
+        """True if a call to ``provider`` may go now (claims the probe of a half-open circuit)."""
+        return self._get(provider).breaker.allow_request()
+
+    def score(self, provider: str) -> float:
+        health = self._get(provider)
+        with self._lock:
+            latency, error_rate = health.decayed(time.monotonic(), self.prior_latency, self.half_life_seconds)
+            return latency * (1 + self.error_penalty * error_rate)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        now = time.monotonic()
+        with self._lock:
+            snapshot = {}
+            for name, h in self._providers.items():
+                latency, error_rate = h.decayed(now, self.prior_latency, self.half_life_seconds)
+                snapshot[name] = {
+                    "latency": round(latency, 3) if h.latency is not None else None,
+                    "error_rate": round(error_rate, 3),
+                    "samples": h.samples,
+                    "state": h.breaker.state,
+                }
+            return snapshot
+
+    def _get(self, provider: str) -> ProviderHealth:
+        with self._lock:
+            health = self._providers.get(provider)
+            if health is None:
+                health = ProviderHealth(self.alpha, self.failure_threshold, self.cooldown_seconds)
+                self._providers[provider] = health
+            return health
+
+
+_lock = threading.Lock()
+_registry: ProviderHealthRegistry | None = None
+
+
+def get_health_registry() -> ProviderHealthRegistry:
+    """Return the process-wide provider health registry, creating it on first use."""
+    global _registry
+    with _lock:
+        if _registry is None:
+            settings = get_settings()
+            _registry = ProviderHealthRegistry(
+                alpha=settings.provider_ewma_alpha,
+                failure_threshold=settings.provider_failure_threshold,
+                cooldown_seconds=settings.provider_cooldown_seconds,
+                half_life_seconds=settings.provider_health_half_life_seconds,
+                explore_rate=settings.provider_explore_rate,
+            )
+        return _registry
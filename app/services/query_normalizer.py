@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import re
+from typing import Any, List
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that also start names ("New Delhi", "Will Smith", "WHO", "IT stocks",
+# "India Today") are kept: dropping them merges unrelated queries
+STOPWORDS = frozenset({
+    "a", "about", "after", "all", "an", "and", "any", "are", "as", "at", "be", "been",
+    "by", "could", "did", "do", "does", "for", "from", "has", "have", "how", "i", "in",
+    "into", "is", "its", "latest", "me", "news", "of", "on", "or", "please", "recent",
+    "so", "tell", "than", "that", "the", "their", "there", "these", "this", "to",
+    "update", "updates", "was", "were", "what", "whats", "when", "where", "which",
+    "why", "with", "would", "you",
+})
+
+
+def fold_plural(word: str) -> str:
+    """Fold simple English plurals to their singular form."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "shes", "ches", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def normalize_terms(text: str) -> List[str]:
+    """Lowercase, strip punctuation and stopwords, and fold plurals."""
+    words = _WORD_RE.findall((text or "").lower().replace("'", ""))
+    return [fold_plural(w) for w in words if w not in STOPWORDS]
+
+
+def canonicalize_query(query: str) -> str:
+    """Order-insensitive canonical form: "India Elections?" -> "election india"."""
+    terms = sorted(set(normalize_terms(query)))
+    if terms:
+        return " ".join(terms)
+    # Queries made only of stopwords still need a stable, distinct key
+    return " ".join(_WORD_RE.findall((query or "").lower().replace("'", "")))
+
+
+def build_cache_key(canonical_query: str, **params: Any) -> str:
+    """Cache key from the canonical query plus every parameter that affects the result."""
+    parts = [f"{name}={params[name]}" for name in sorted(params)]
+    return "|".join(["news", canonical_query, *parts])
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+from app.services.query_normalizer import canonicalize_query
+
+# A question is only split when it is explicitly comparative
+_COMPARATIVE_RE = re.compile(
+    r"\b(compare|comparing|comparison|versus|vs\.?|difference|differences|compared)\b",
+    re.IGNORECASE,
+)
+_LEAD_RE = re.compile(
+    r"^\s*(?:please\s+)?(?:can you\s+)?(?:compare|comparing|comparison (?:of|between)|"
+    r"(?:(?:what(?:'s|\s+is|\s+are)|whats)\s+(?:the\s+)?)?differences? (?:of|between)|how (?:do|does))\s+",
+    re.IGNORECASE,
+)
+_SPLIT_RE = re.compile(
+    r"\s*(?:,|;|\bvs\.?|\bversus\b|\bcompared? (?:to|with)\b|\band\b|&)\s*",
+    re.IGNORECASE,
+)
+_TRAIL_RE = re.compile(r"[?.!\s]+$")
+# Words that mean the lead-in wasn't stripped cleanly
+_LEFTOVER_RE = re.compile(
+    r"\b(what|whats|what's|which|compare|comparing|comparison|difference|differences|between)\b",
+    re.IGNORECASE,
+)
+# "India vs Pakistan match" is one event, not two searches
+_EVENT_RE = re.compile(
+    r"\b(match|matches|game|final|semi-?final|series|test|odi|t20|clash|fixture|tie|score|scores|"
+    r"result|results|highlights|live|fight|bout|debate|showdown)$",
+    re.IGNORECASE,
+)
+_HEAD_TO_HEAD_RE = re.compile(r"\b(vs\.?|versus)(?=\s|$)", re.IGNORECASE)
+
+
+# A shared leading topic must end in one of these: "inflation in India vs US"
+_PREFIX_END = frozenset({"in", "of", "for", "at", "on", "from", "across"})
+
+
+def _is_entity(word: str) -> bool:
+    # Only capitalization tells a name ("US") from a topic word ("inflation")
+    return word[:1].isupper()
+
+
+def plan_subqueries(query: str, max_subqueries: int = 4) -> List[str]:
+    """Split a comparative question into one search per entity.
+
+    Only splits it can read unambiguously: every side a single word
+    ("Apple vs Samsung"), single capitalized entities with a lowercase
+    topic after the last one ("compare India and US inflation news" ->
+    ["India inflation news", "US inflation news"]), or a lowercase topic
+    ending in a preposition before the first one ("inflation in India vs
+    US" -> ["inflation in India", "inflation in US"]). Multi-word names,
+    head-to-head events ("India vs Pakistan match") and anything else come
+    back unchanged as a single query.
+    """
+    if not query or not _COMPARATIVE_RE.search(query):
+        return [query]
+
+    body = _TRAIL_RE.sub("", _LEAD_RE.sub("", query))
+    if _HEAD_TO_HEAD_RE.search(body) and _EVENT_RE.search(body):
+        return [query]
+    parts = [part.strip() for part in _SPLIT_RE.split(body) if part and part.strip()]
+    if len(parts) < 2 or len(parts) > max_subqueries:
+        return [query]
+
+    words = [part.split() for part in parts]
+    head, last = words[:-1], words[-1]
+    if all(len(w) == 1 for w in words):
+        subqueries = [w[0] for w in words]
+    elif all(len(w) == 1 and _is_entity(w[0]) for w in head) and _is_entity(last[0]) and not any(
+        _is_entity(w) for w in last[1:]
+    ):
+        # "India and US inflation": the topic trails the last entity
+        suffix = last[1:]
+        subqueries = [" ".join(w + suffix) for w in head] + [" ".join(last)]
+    elif (
+        all(len(w) == 1 and _is_entity(w[0]) for w in words[1:])
+        and len(words[0]) > 2
+        and _is_entity(words[0][-1])
+        and not any(_is_entity(w) for w in words[0][:-1])
+        and words[0][-2].lower() in _PREFIX_END
+    ):
+        # "inflation in India vs US": the topic leads the first entity
+        prefix = words[0][:-1]
+        subqueries = [" ".join(words[0])] + [" ".join(prefix + w) for w in words[1:]]
+    else:
+        return [query]
+
+    # A side that kept lead-in words or repeats a word is a bad split; search the question as asked
+    for subquery in subqueries:
+        terms = [w.lower() for w in subquery.split()]
+        if _LEFTOVER_RE.search(subquery) or len(terms) != len(set(terms)):
+            return [query]
+
+    # Drop sides that normalize to the same search
+    seen, unique = set(), []
+    for subquery in subqueries:
+        key = canonicalize_query(subquery)
+        if key not in seen:
+            seen.add(key)
+            unique.append(subquery)
+    return unique if len(unique) > 1 else [query]
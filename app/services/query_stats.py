@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, NamedTuple, Tuple
+
+from app.config.settings import get_settings
+
+
+class QueryRequest(NamedTuple):
+    """A news request as the engine saw it; ``query`` is the latest raw phrasing."""
+
+    query: str
+    country: str
+    breaking: bool
+    limit: int
+
+
+class QueryPopularity:
+    """Counts requests per cache key over a sliding time window."""
+
+    def __init__(self, window_seconds: float = 3600):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._events: Deque[Tuple[float, str]] = deque()
+        self._counts: Counter = Counter()
+        self._latest: Dict[str, QueryRequest] = {}
+
+    def record(self, cache_key: str, request: QueryRequest) -> None:
+        now = time.time()
+        with self._lock:
+            self._events.append((now, cache_key))
+            self._counts[cache_key] += 1
+            self._latest[cache_key] = request
+            self._expire(now)
+
+    def top(self, n: int) -> List[QueryRequest]:
+        """The ``n`` most requested keys in the window, most requested first."""
+        with self._lock:
+            self._expire(time.time())
+            return [self._latest[key] for key, _ in self._counts.most_common(n)]
+
+    def _expire(self, now: float) -> None:
+        while self._events and now - self._events[0][0] > self.window_seconds:
+            _, key = self._events.popleft()
+            self._counts[key] -= 1
+            if self._counts[key] <= 0:
+                del self._counts[key]
+                del self._latest[key]
+
+
+_lock = threading.Lock()
+_popularity: QueryPopularity | None = None
+
+
+def get_query_popularity() -> QueryPopularity:
+    """Return the process-wide query popularity tracker, creating it on first use."""
+    global _popularity
+    with _lock:
+        if _popularity is None:
+            _popularity = QueryPopularity(window_seconds=get_settings().news_prefetch_window_seconds)
+        return _popularity
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from app.config.settings import get_settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (bucket name, capacity, window seconds)
+BucketSpec = Tuple[str, int, float]
+
+# Windows at least this long are fixed calendar windows rather than refilling buckets
+_FIXED_WINDOW_SECONDS = 86400
+
+
+class ProviderRateLimiter:
+    """Token-bucket limiter per provider, persisted in SQLite so budgets survive restarts.
+
+    Each provider can have several buckets (e.g. per-minute and per-day);
+    a request needs a token from all of them. Buckets refill continuously,
+    except those with a window of a day or more: providers count those
+    quotas per calendar day, so they are fixed windows aligned to the epoch
+    (a daily bucket refills in full at 00:00 UTC).
+    """
+
+    def __init__(self, path: str, limits: Dict[str, List[BucketSpec]]):
+        self.limits = limits
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                provider TEXT,
+                bucket TEXT,
+                tokens REAL,
+                updated_at REAL,
+                PRIMARY KEY (provider, bucket)
+            )
+            """
+        )
+
+    def try_acquire(self, provider: str, tokens: float = 1) -> bool:
+        """Take ``tokens`` from every bucket of ``provider``; False if any is short."""
+        if provider not in self.limits:
+            return True
+        with self._lock:
+            # IMMEDIATE also serializes other processes sharing the file
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = self._refill(provider)
+                allowed = all(level >= tokens for level in levels.values())
+                if allowed:
+                    levels = {name: level - tokens for name, level in levels.items()}
+                self._store(provider, levels)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if not allowed:
+            logger.warning(f"Rate budget exhausted for {provider}: {self._format(levels)}")
+        return allowed
+
+    def has_budget(self, provider: str, tokens: float = 1) -> bool:
+        return all(level >= tokens for level in self.remaining(provider).values())
+
+    def has_spare_budget(self, provider: str, reserve_fraction: float) -> bool:
+        """True if one more call still leaves ``reserve_fraction`` of every bucket's capacity."""
+        levels = self.remaining(provider)
+        return all(
+            levels[name] - 1 >= capacity * reserve_fraction
+            for name, capacity, _ in self.limits.get(provider, [])
+        )
+
+    def remaining(self, provider: str) -> Dict[str, float]:
+        if provider not in self.limits:
+            return {}
+        with self._lock:
+            return self._refill(provider)
+
+    def drain(self, provider: str, bucket: str) -> None:
+        """Empty a bucket, e.g. after the provider answered 429."""
+        if provider not in self.limits:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = self._refill(provider)
+                if bucket in levels:
+                    levels[bucket] = 0.0
+                    self._store(provider, levels)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _refill(self, provider: str) -> Dict[str, float]:
+        now = time.time()
+        rows = dict(
+            (row[0], (row[1], row[2]))
+            for row in self._conn.execute(
+                "SELECT bucket, tokens, updated_at FROM rate_buckets WHERE provider=?",
+                (provider,),
+            )
+        )
+        levels = {}
+        for name, capacity, window in self.limits[provider]:
+            tokens, updated_at = rows.get(name, (float(capacity), now))
+            if window >= _FIXED_WINDOW_SECONDS:
+                # A new window starts full; within one, spent tokens stay spent
+                refill = capacity if now // window > updated_at // window else 0.0
+            else:
+                refill = (now - updated_at) * capacity / window
+            levels[name] = min(float(capacity), tokens + refill)
+        return levels
+
+    def _store(self, provider: str, levels: Dict[str, float]) -> None:
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO rate_buckets (provider, bucket, tokens, updated_at) VALUES (?,?,?,?)",
+            [(provider, name, level, now) for name, level in levels.items()],
+        )
+
+    def _format(self, levels: Dict[str, float]) -> str:
+        return ", ".join(f"{name}={level:.1f}" for name, level in levels.items())
+
+
+_lock = threading.Lock()
+_limiter: ProviderRateLimiter | None = None
+
+
+def get_rate_limiter() -> ProviderRateLimiter:
+    """Return the process-wide provider rate limiter, creating it on first use."""
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            settings = get_settings()
+            _limiter = ProviderRateLimiter(
+                path=settings.rate_limit_db_path,
+                limits={
+                    "gnews": [
+                        ("minute", settings.gnews_minute_limit, 60),
+                        ("day", settings.gnews_daily_limit, 86400),
+                    ],
+                    "newsapi": [
+                        ("minute", settings.newsapi_minute_limit, 60),
+                        ("day", settings.newsapi_daily_limit, 86400),
+                    ],
+                    "newsdata": [
+                        ("minute", settings.newsdata_minute_limit, 60),
+                        ("day", settings.newsdata_daily_limit, 86400),
+                    ],
+                },
+            )
+        return _limiter
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from cachetools import TTLCache
+
+from app.config.settings import get_settings
+from app.services.article import Article
+from app.services.dedup import canonical_url
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation; word order stays."""
+    return _SPACE_RE.sub(" ", (query or "").lower()).strip().rstrip("?!.,;: ")
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def fingerprint_articles(articles: Iterable[Article]) -> str:
+    """Order-insensitive fingerprint of an article set (canonical URL + publish time)."""
+    items = sorted(f"{canonical_url(a.url) or a.title}@{a.published_at}" for a in articles)
+    return _digest(*items)
+
+
+def fingerprint_history(history: Iterable[Dict[str, str]]) -> str:
+    return _digest(*(f"{m.get('role', '')}:{m.get('content', '')}" for m in history))
+
+
+def response_cache_key(
+    query: str,
+    articles: Iterable[Article],
+    model_name: str,
+    max_output_tokens: int,
+    temperature: float,
+    history: Iterable[Dict[str, str]] = (),
+) -> str:
+    """Key for a generated answer.
+
+    Only case, spacing and trailing punctuation are normalized: question
+    words and word order change the answer ("why" vs "when", who beat
+    whom). ``history`` is the turns before this question, which the
+    prompt also includes.
+    """
+    return _digest(
+        normalize_question(query),
+        fingerprint_articles(articles),
+        fingerprint_history(history),
+        model_name,
+        str(max_output_tokens),
+        f"{temperature:g}",
+    )
+
+
+class ResponseCache:
+    """LRU+TTL memory cache for LLM answers, optionally backed by SQLite.
+
+    The SQLite tier outlives restarts and is shared by processes using the
+    same file; a disk hit is promoted into memory.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 900, db_path: str = ""):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._memory: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._skipped = 0
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT,
+                    created_at REAL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory_hits += 1
+                return response
+            response = self._get_disk(key)
+            if response is not None:
+                self._disk_hits += 1
+                self._memory[key] = response
+                return response
+            self._misses += 1
+            return None
+
+    def set(self, key: str, response: str) -> None:
+        with self._lock:
+            self._memory[key] = response
+            self._stores += 1
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, created_at) VALUES (?,?,?)",
+                    (key, response, time.time()),
+                )
+                self._conn.commit()
+
+    def record_skip(self) -> None:
+        """Count a generation that was not cacheable (e.g. non-zero temperature)."""
+        with self._lock:
+            self._skipped += 1
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT response, created_at FROM llm_responses WHERE key=?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[1] >= self.ttl:
+            self._conn.execute("DELETE FROM llm_responses WHERE key=?", (key,))
+            self._conn.commit()
+            return None
+        return row[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_responses")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "size": len(self._memory),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "skipped": self._skipped,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_lock = threading.Lock()
+_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide LLM response cache, creating it on first use."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = ResponseCache(
+                maxsize=settings.llm_cache_size,
+                ttl=settings.llm_cache_ttl_seconds,
+                db_path=settings.llm_cache_db_path,
+            )
+        return _cache
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Tuple, Type
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RetryStats:
+    attempts: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    empty_results: int = 0
+    budget_exhausted: bool = False
+    elapsed_seconds: float = 0.0
+    last_error: str = ""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry with jittered exponential backoff inside a total latency budget.
+
+    Transport errors are retried; empty results are returned immediately
+    unless ``retry_on_empty`` is set.
+    """
+
+    max_attempts: int = 2
+    budget_seconds: float = 8.0
+    base_delay: float = 0.25
+    max_delay: float = 2.0
+    jitter: float = 0.5
+    retry_on_empty: bool = False
+    timeout_exceptions: Tuple[Type[BaseException], ...] = (TimeoutError,)
+
+    def backoff(self, retry: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** retry))
+        return delay * (1 - self.jitter * random.random())
+
+    def run(
+        self,
+        func: Callable[[float], Any],
+        *,
+        default: Any = None,
+        budget_seconds: Optional[float] = None,
+    ) -> Tuple[Any, RetryStats]:
+        """Call ``func(remaining_seconds)`` until it yields a result or the budget is spent."""
+        stats = RetryStats()
+        started = time.monotonic()
+        deadline = started + (self.budget_seconds if budget_seconds is None else budget_seconds)
+        result = default
+
+        for attempt in range(self.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                stats.budget_exhausted = True
+                break
+
+            stats.attempts += 1
+            try:
+                result = func(remaining)
+            except self.timeout_exceptions as e:
+                stats.timeouts += 1
+                stats.last_error = str(e)
+                result = default
+            except Exception as e:
+                stats.errors += 1
+                stats.last_error = str(e)
+                result = default
+            else:
+                if result:
+                    break
+                stats.empty_results += 1
+                if not self.retry_on_empty:
+                    break
+
+            if attempt == self.max_attempts - 1:
+                break
+            delay = self.backoff(attempt)
+            if time.monotonic() + delay >= deadline:
+                stats.budget_exhausted = True
+                break
+            stats.retries += 1
+            time.sleep(delay)
+
+        stats.elapsed_seconds = round(time.monotonic() - started, 3)
+        return (result if result is not None else default), stats
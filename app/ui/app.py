@@ -22,11 +22,14 @@ from app.memory.sqlite_store import (
     get_messages as sqlite_get_messages,
 )
 from app.prompts.prompt import SimplePromptBuilder
-from app.services.gemini_client import GeminiClient, GeminiGenerationConfig
-from app.services.response_streamer import stream_words
+from app.services.gemini_client import GeminiGenerationConfig, get_gemini_client
+from app.services.model_router import get_model_router
 from app.ui.styles import apply_global_styles, chatgpt_header, chatgpt_input_placeholder, realtime_news_indicator
 from app.utils.helpers import format_articles_for_display
 from app.services.news_engine import AdvancedNewsEngine
+from app.services.news_watch import get_watch_manager
+from app.services.prefetch import start_prefetch
+from app.services.response_cache import response_cache_key
 
 
 def is_follow_up(user_input: str) -> bool:
@@ -106,6 +109,54 @@ def generate_chat_title(user_input: str) -> str:
     return cleaned
 
 
+# How often an open chat checks its watch subscription for new articles
+WATCH_REFRESH_SECONDS = 10
+
+_fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+
+def sync_watch(enabled: bool) -> None:
+    """Keep the current chat's watch subscription in line with the sidebar toggle and topic."""
+    subscriptions = st.session_state.setdefault("watch_subscriptions", {})
+    chat_id = st.session_state.current_chat
+    topic = st.session_state.get("current_topic")
+    country = st.session_state.get("selected_country", "in")
+
+    subscription = subscriptions.get(chat_id)
+    if subscription is not None and (
+        not enabled or subscription.closed or subscription.query != topic or subscription.country != country
+    ):
+        subscription.close()
+        del subscriptions[chat_id]
+        subscription = None
+    if enabled and topic and subscription is None:
+        subscriptions[chat_id] = get_watch_manager().watch(
+            topic, country, seed=st.session_state.get("current_articles") or []
+        )
+
+
+@_fragment(run_every=WATCH_REFRESH_SECONDS)
+def watch_updates() -> None:
+    """Post batched watch updates into the open chat."""
+    subscription = st.session_state.get("watch_subscriptions", {}).get(st.session_state.current_chat)
+    if subscription is None:
+        return
+    articles = subscription.drain()
+    if not articles:
+        return
+
+    headlines = "<br>".join(f"• {a.title} ({a.source})" for a in articles)
+    st.session_state.conversations[st.session_state.current_chat].append({
+        "role": "assistant",
+        "content": f"🔴 {len(articles)} new update(s) on <b>{subscription.query}</b>:<br>{headlines}",
+        "sources": articles,
+        "has_sources": True,
+    })
+    # Follow-up questions should see the new articles too
+    st.session_state.current_articles = articles + list(st.session_state.current_articles)
+    st.rerun()
+
+
 def get_chat_display_name(chat_id: str, conversations: dict, chat_titles: dict) -> str:
     """Get the display name for a chat - either the title or a default."""
     # If we have a custom title, use it
@@ -138,6 +189,8 @@ def main() -> None:
     init_session_state()
     if settings.use_sqlite:
         init_db_sqlite()
+    # Process-wide and idempotent, so reruns don't spawn extra threads
+    start_prefetch()
     
     # Initialize conversation memory
     if "conversations" not in st.session_state or not isinstance(st.session_state.conversations, dict):
@@ -209,6 +262,14 @@ def main() -> None:
         # Breaking news mode
         breaking = st.toggle("Breaking News Mode")
         st.session_state.breaking_mode = breaking
+
+        # Live updates: one shared poller per topic, however many chats watch it
+        watching = st.toggle(
+            "Watch for updates",
+            disabled=not (breaking and st.session_state.get("current_topic")),
+            help="Post new articles on the current topic into this chat as they are published.",
+        )
+        sync_watch(breaking and watching)
         
         if st.session_state.get("is_streaming"):
             if st.button("⛔ Stop", use_container_width=True):
@@ -237,6 +298,9 @@ def main() -> None:
                     with st.expander("📚 Sources", expanded=False):
                         st.markdown(format_articles_for_display(message["sources"]))
 
+    if st.session_state.get("watch_subscriptions", {}).get(st.session_state.current_chat) is not None:
+        watch_updates()
+
     # Handle pending input from suggestions
     user_input = st.chat_input("Ask about current events...", key="main_input")
     
@@ -453,7 +517,7 @@ section[data-testid="stSidebar"] button:focus {
             country = st.session_state.get("selected_country", "in")
             breaking = st.session_state.get("breaking_mode", False)
             
-            news_articles = news_engine.fetch_news(
+            news_articles = news_engine.fetch_planned(
                 query=user_input,
                 country=country,
                 breaking=breaking,
@@ -465,57 +529,77 @@ section[data-testid="stSidebar"] button:focus {
             st.session_state.current_articles = news_articles
 
         conversation = last_n_messages(get_messages(), n=settings.context_message_limit)
+        memory_key = f"{st.session_state.session_id}:{st.session_state.current_chat}"
 
         # Use optimized prompt builder
         prompt_builder = SimplePromptBuilder(
             max_history_messages=settings.context_message_limit,
-            max_article_chars=600
+            max_prompt_tokens=settings.prompt_token_budget,
         )
         final_prompt = prompt_builder.build(
-            history=conversation,
+            # The whole chat: the builder keeps the window and summarizes what came before
+            history=get_messages(),
             news_articles=news_articles,
-            user_query=user_input
+            user_query=user_input,
+            conversation_id=memory_key if settings.summary_memory_enabled else None,
         )
 
-        gemini = GeminiClient(
-            api_key=settings.gemini_api_key,
-            config=GeminiGenerationConfig(
-                model_name=settings.gemini_model, 
+        # Light turns go to the lite model with a smaller cap, heavy ones to the full model
+        if settings.model_router_enabled:
+            route = get_model_router().route(
+                query=user_input,
+                history=conversation,
+                articles=news_articles,
+                follow_up=is_follow_up(user_input),
+            )
+            gemini_config = route.config
+        else:
+            route = None
+            gemini_config = GeminiGenerationConfig(
+                model_name=settings.gemini_model,
                 max_output_tokens=settings.max_output_tokens
-            ),
+            )
+        # Shared across reruns and sessions; rebuilt only when the key or config changes
+        gemini = get_gemini_client(gemini_config)
+        # Same question, same articles, same earlier turns -> reuse an earlier answer
+        cache_key = response_cache_key(
+            user_input,
+            news_articles,
+            gemini_config.model_name,
+            gemini_config.max_output_tokens,
+            gemini_config.temperature,
+            # The last message is this question itself, already in the key
+            history=conversation[:-1],
         )
 
         try:
-            # Generate response
+            # Stream the response as Gemini produces it
             start_time = time.time()
-            full_text = gemini.generate(prompt=final_prompt)
-            end_time = time.time()
-            generation_time = round(end_time - start_time, 2)
-
-            # Parse JSON response
-            parsed_response = prompt_builder.parse_response(full_text)
-            final_summary = parsed_response["summary"]
-
-            # Clear typing and show streaming response
-            message_placeholder.empty()
-            
-            # Stream the response
-            streamed = ""
-            for chunk in stream_words(final_summary, delay_seconds=settings.stream_delay_seconds):
-                streamed = chunk
+            first_token_time = None
+            full_text = ""
+            for delta in gemini.stream(prompt=final_prompt, cache_key=cache_key):
+                if first_token_time is None:
+                    first_token_time = round(time.time() - start_time, 2)
+                full_text += delta
                 with message_placeholder.container():
                     st.markdown(f'''
                     <div class="message-container">
-                        <div style="color: #ffffff; line-height: 1.6;">{streamed}▌</div>
+                        <div style="color: #ffffff; line-height: 1.6;">{full_text}▌</div>
                     </div>
                     ''', unsafe_allow_html=True)
+            generation_time = round(time.time() - start_time, 2)
+            if route is not None:
+                get_model_router().record_outcome(route, first_token_time, generation_time, len(full_text))
+
+            parsed_response = prompt_builder.parse_response(full_text)
+            streamed = parsed_response["summary"]
 
             # Final display without cursor
             with message_placeholder.container():
                 st.markdown(f'''
                 <div class="message-container">
                     <div style="color: #ffffff; line-height: 1.6;">{streamed}</div>
-                    <div class="timestamp">Generated in {generation_time}s</div>
+                    <div class="timestamp">Prompt {prompt_builder.last_prompt_tokens} tokens · first token in {first_token_time}s · generated in {generation_time}s</div>
                 </div>
                 ''', unsafe_allow_html=True)
 
@@ -531,6 +615,9 @@ section[data-testid="stSidebar"] button:focus {
                 "sources": news_articles,
                 "has_sources": bool(news_articles)
             })
+            if settings.summary_memory_enabled:
+                # Background: messages leaving the history window are folded into the summary
+                prompt_builder.remember(memory_key, get_messages())
 
         except Exception as e:
             with message_placeholder.container():
@@ -2,26 +2,34 @@ from __future__ import annotations
 
 from typing import Dict, Iterable, List
 
+from app.services.article import Article
+
 
 def guess_news_query(user_text: str) -> Dict[str, str]:
     return {"keyword": (user_text or "").strip()}
 
 
-def format_articles_for_display(articles: Iterable[Dict[str, str]]) -> str:
+def format_articles_for_display(articles: Iterable[Article]) -> str:
     """Format articles as markdown with clickable source links."""
     lines: List[str] = []
     for idx, a in enumerate(articles, 1):
-        title = (a.get("title") or "").strip()
-        link = (a.get("link") or a.get("url") or "").strip()
-        source = (a.get("source") or a.get("source_id") or "Unknown").strip()
+        title = a.title.strip()
+        link = a.link.strip()
+        source = (a.source or a.source_id or "Unknown").strip()
         
         if not title:
             continue
             
         if link:
             # Create clickable markdown link
-            lines.append(f"{idx}. **[{title}]({link})** — *{source}*")
+            line = f"{idx}. **[{title}]({link})** — *{source}*"
         else:
-            lines.append(f"{idx}. **{title}** — *{source}*")
+            line = f"{idx}. **{title}** — *{source}*"
+
+        # Other outlets carrying the same story (merged by dedup)
+        related = [f"[{name or 'Unknown'}]({url})" for name, url in a.related_sources if url]
+        if related:
+            line += "  \n   Also reported by: " + ", ".join(related)
+        lines.append(line)
             
     return "\n\n".join(lines) if lines else "No sources available."
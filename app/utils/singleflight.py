@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "started_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started_at = time.monotonic()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller (the leader) runs ``func``; callers arriving while it is
+    in flight wait for its result. Followers wait at most ``timeout`` seconds
+    and then run ``func`` themselves, and a call older than ``timeout`` is no
+    longer joined, so a hung leader never blocks anyone for longer than that.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+
+    def do(self, key: str, func: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and timeout is not None and time.monotonic() - call.started_at > timeout:
+                call = None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                self.followers += 1
+                leader = False
+
+        if leader:
+            return self._lead(key, call, func)
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"In-flight call for {key} exceeded {timeout}s; running it independently")
+            return func()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _lead(self, key: str, call: _Call, func: Callable[[], Any]) -> Any:
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                # A timed-out call may already have been replaced by a newer leader
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "followers": self.followers,
+                "timeouts": self.timeouts,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.config.settings import get_settings
+from app.services import gemini_client
+from app.services.gemini_client import GeminiClient, GeminiGenerationConfig, GeminiRegistry
+from app.services.key_pool import ApiKeyPool, key_id
+from app.services.model_availability import ModelAvailability
+
+
+class _FakeStream:
+    def __init__(self, model: "_FakeModel", chunks):
+        self._model = model
+        self._chunks = list(chunks)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._chunks:
+            raise StopAsyncIteration
+        await asyncio.sleep(0)
+        return SimpleNamespace(text=self._chunks.pop(0))
+
+    async def aclose(self):
+        self.closed = True
+
+
+class _FakeModel:
+    """Stands in for a GenerativeModel; tracks how many calls run at once."""
+
+    def __init__(self, delay: float = 0.02, chunks=("Hello", ", ", "world")):
+        self.delay = delay
+        self.chunks = chunks
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.started = asyncio.Event()
+        self.block = False
+        self.streams = []
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.started.set()
+        try:
+            if self.block:
+                await asyncio.Event().wait()
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if stream:
+            response = _FakeStream(self, self.chunks)
+            self.streams.append(response)
+            return response
+        return SimpleNamespace(text=f"answer: {prompt}")
+
+
+@pytest.fixture
+def limit(monkeypatch):
+    monkeypatch.setenv("GEMINI_MAX_CONCURRENCY", "2")
+    return get_settings().gemini_max_concurrency
+
+
+def _client(model: _FakeModel) -> GeminiClient:
+    registry = GeminiRegistry(model_factory=lambda api_key, model_name, config: model)
+    return GeminiClient(
+        api_key="test-key",
+        config=GeminiGenerationConfig(model_name="gemini-test", temperature=0.0),
+        registry=registry,
+        availability=ModelAvailability(),
+    )
+
+
+def _free_slots() -> int:
+    return gemini_client._semaphore()._value
+
+
+def test_agenerate_returns_the_model_text(limit):
+    model = _FakeModel()
+
+    async def main():
+        text = await _client(model).agenerate(prompt="hi")
+        return text, _free_slots()
+
+    text, free = asyncio.run(main())
+    assert text == "answer: hi"
+    assert free == limit
+    assert model.calls == 1
+
+
+def test_agenerate_stays_within_the_concurrency_limit(limit):
+    model = _FakeModel(delay=0.05)
+
+    async def main():
+        client = _client(model)
+        texts = await asyncio.gather(*(client.agenerate(prompt=str(i)) for i in range(limit * 3)))
+        return texts, _free_slots()
+
+    texts, free = asyncio.run(main())
+    assert texts == [f"answer: {i}" for i in range(limit * 3)]
+    assert model.peak == limit
+    assert free == limit
+
+
+def test_cancelled_agenerate_releases_its_slot(limit):
+    model = _FakeModel()
+    model.block = True
+
+    async def main():
+        client = _client(model)
+        task = asyncio.ensure_future(client.agenerate(prompt="slow"))
+        await model.started.wait()
+        assert _free_slots() == limit - 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        free_after_cancel = _free_slots()
+        model.block = False
+        return free_after_cancel, await client.agenerate(prompt="next")
+
+    free_after_cancel, text = asyncio.run(main())
+    assert free_after_cancel == limit
+    assert text == "answer: next"
+
+
+def test_astream_yields_chunks_and_releases_its_slot(limit):
+    model = _FakeModel()
+
+    async def main():
+        parts = [part async for part in _client(model).astream(prompt="hi")]
+        return parts, _free_slots()
+
+    parts, free = asyncio.run(main())
+    assert parts == ["Hello", ", ", "world"]
+    assert free == limit
+    assert model.streams[0].closed
+
+
+def test_astream_holds_its_slot_until_closed(limit):
+    model = _FakeModel()
+
+    async def main():
+        stream = _client(model).astream(prompt="hi")
+        first = await stream.__anext__()
+        held = _free_slots()
+        await stream.aclose()
+        return first, held, _free_slots()
+
+    first, held, free = asyncio.run(main())
+    assert first == "Hello"
+    assert held == limit - 1
+    assert free == limit
+    assert model.streams[0].closed
+
+
+def test_cancelled_astream_releases_its_slot(limit):
+    model = _FakeModel()
+    model.block = True
+
+    async def main():
+        async def consume():
+            return [part async for part in _client(model).astream(prompt="hi")]
+
+        task = asyncio.ensure_future(consume())
+        await model.started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return _free_slots()
+
+    assert asyncio.run(main()) == limit
+
+
+def test_pooled_keys_without_a_usable_model_keep_their_budget(limit):
+    model = _FakeModel()
+    pool = ApiKeyPool(["dead-key", "live-key"], requests_per_minute=5)
+    availability = ModelAvailability()
+    client = GeminiClient(
+        api_key="",
+        config=GeminiGenerationConfig(model_name="gemini-test", temperature=0.0),
+        registry=GeminiRegistry(model_factory=lambda api_key, model_name, config: model),
+        availability=availability,
+        key_pool=pool,
+    )
+    for model_name in client._candidate_models():
+        availability.record_unavailable("dead-key", model_name, "404 not found")
+
+    async def main():
+        return [await client.agenerate(prompt=str(i)) for i in range(3)]
+
+    texts = asyncio.run(main())
+
+    assert texts == ["answer: 0", "answer: 1", "answer: 2"]
+    usage = pool.usage()
+    assert usage[key_id("dead-key")]["requests"] == 0
+    assert usage[key_id("dead-key")]["budget"] == 5
+    assert usage[key_id("live-key")]["requests"] == 3
+
+
+def test_default_handles_are_bound_to_their_own_key():
+    registry = GeminiRegistry()
+    config = GeminiGenerationConfig(model_name="gemini-test", temperature=0.0)
+    first = registry.model("key-a", "gemini-test", config)
+    second = registry.model("key-b", "gemini-test", config)
+
+    assert first is not second
+    assert registry.model("key-a", "gemini-test", config) is first
+    assert registry.service_client("key-a") is not registry.service_client("key-b")
+    assert first.model_name == "models/gemini-test"
+
+    async def main():
+        return registry.async_service_client("key-a")
+
+    assert asyncio.run(main()) is not asyncio.run(main())
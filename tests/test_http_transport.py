@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.services.http_transport import HttpTransport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so the server keeps connections open between requests
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address, dict(self.headers)))
+        if self.path.startswith("/slow"):
+            time.sleep(1.0)
+        body = b'{"status": "ok"}'
+        headers = {"Content-Type": "application/json"}
+        if self.path.startswith("/gzip"):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def transport():
+    transport = HttpTransport(connect_timeout=1.0, read_timeout=2.0, pool_maxsize=2)
+    yield transport
+    transport.close()
+
+
+def _url(server, path: str) -> str:
+    host, port = server.server_address
+    return f"http://{host}:{port}{path}"
+
+
+def test_requests_to_one_host_reuse_the_connection(server, transport):
+    for _ in range(3):
+        response = transport.get(_url(server, "/search"), params={"q": "india"})
+        assert response.status_code == 200
+
+    client_ports = {client[1] for _, client, _ in server.requests}
+    assert len(server.requests) == 3
+    assert len(client_ports) == 1
+    assert server.requests[0][0] == "/search?q=india"
+
+
+def test_one_session_per_host(server, transport):
+    assert transport.session_for(_url(server, "/a")) is transport.session_for(_url(server, "/b"))
+    assert transport.session_for(_url(server, "/a")) is not transport.session_for("http://example.invalid/")
+
+
+def test_gzip_responses_are_decoded(server, transport):
+    response = transport.get(_url(server, "/gzip"))
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json() == {"status": "ok"}
+    sent_headers = server.requests[0][2]
+    assert "gzip" in sent_headers["Accept-Encoding"]
+    assert sent_headers["Connection"] == "keep-alive"
+
+
+def test_timeout_budget_caps_the_read_timeout(server, transport):
+    started = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        transport.get(_url(server, "/slow"), timeout=0.2)
+    assert time.monotonic() - started < 0.9
+
+
+def test_timeout_defaults_and_floor(transport):
+    assert transport._timeout(None) == (1.0, 2.0)
+    assert transport._timeout(0.5) == (0.5, 0.5)
+    assert transport._timeout(5) == (1.0, 2.0)
+    assert transport._timeout(0) == (0.1, 0.1)
+
+
+def test_saturated_pool_waits_no_longer_than_the_timeout(server):
+    transport = HttpTransport(connect_timeout=1.0, read_timeout=2.0, pool_maxsize=1)
+    slow = threading.Thread(target=transport.get, args=(_url(server, "/slow"),))
+    slow.start()
+    try:
+        while not server.requests:
+            time.sleep(0.01)
+        started = time.monotonic()
+        with pytest.raises(requests.ConnectTimeout):
+            transport.get(_url(server, "/search"), timeout=0.2)
+        assert time.monotonic() - started < 0.9
+    finally:
+        slow.join()
+    # The slot comes back once the slow request finishes
+    assert transport.get(_url(server, "/search")).status_code == 200
+    transport.close()
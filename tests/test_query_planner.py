@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.query_planner import plan_subqueries
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Compare Modi and Rahul Gandhi speeches",
+        "compare inflation in India and the US",
+        "compare Tata Motors and Mahindra sales",
+        "compare US and UK interest rates and inflation",
+        "India vs Pakistan match",
+        "difference between repo rate and reverse repo rate",
+        "latest news on elections",
+    ],
+)
+def test_ambiguous_or_plain_queries_stay_whole(query):
+    assert plan_subqueries(query) == [query]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("compare India and US inflation news", ["India inflation news", "US inflation news"]),
+        ("What's the difference between Apple and Samsung phones?", ["Apple phones", "Samsung phones"]),
+        ("inflation in India vs US", ["inflation in India", "inflation in US"]),
+        ("Apple vs Samsung", ["Apple", "Samsung"]),
+        ("BJP vs Congress?", ["BJP", "Congress"]),
+    ],
+)
+def test_unambiguous_comparisons_split_per_entity(query, expected):
+    assert plan_subqueries(query) == expected
+
+
+def test_too_many_sides_stay_whole():
+    query = "compare Apple, Samsung, Xiaomi and Oppo phones"
+    assert plan_subqueries(query, max_subqueries=3) == [query]
+    assert plan_subqueries(query) == ["Apple phones", "Samsung phones", "Xiaomi phones", "Oppo phones"]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import rate_limiter
+from app.services.rate_limiter import ProviderRateLimiter
+
+# 2026-10-17 23:00:00 UTC
+_LATE_EVENING = 1792278000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [_LATE_EVENING]
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: now[0])
+    return now
+
+
+def _limiter(tmp_path) -> ProviderRateLimiter:
+    return ProviderRateLimiter(
+        str(tmp_path / "data" / "rate_limits.db"),
+        {"gnews": [("minute", 10, 60), ("day", 5, 86400)]},
+    )
+
+
+def test_daily_quota_does_not_refill_within_the_utc_day(tmp_path, clock):
+    limiter = _limiter(tmp_path)
+    for _ in range(5):
+        clock[0] += 60
+        assert limiter.try_acquire("gnews")
+    clock[0] += 1800
+    assert not limiter.try_acquire("gnews")
+    assert limiter.remaining("gnews")["day"] == 0
+
+
+def test_daily_quota_resets_at_utc_midnight(tmp_path, clock):
+    limiter = _limiter(tmp_path)
+    for _ in range(5):
+        clock[0] += 60
+        limiter.try_acquire("gnews")
+    clock[0] += 3600
+    assert limiter.remaining("gnews")["day"] == 5
+    assert limiter.try_acquire("gnews")
+
+
+def test_minute_bucket_refills_continuously(tmp_path, clock):
+    limiter = _limiter(tmp_path)
+    limiter.drain("gnews", "minute")
+    assert not limiter.has_budget("gnews")
+    clock[0] += 30
+    assert limiter.remaining("gnews")["minute"] == pytest.approx(5)
+
+
+def test_budget_persists_across_instances(tmp_path, clock):
+    _limiter(tmp_path).drain("gnews", "day")
+    assert not _limiter(tmp_path).try_acquire("gnews")
+
+
+def test_spare_budget_keeps_the_reserve(tmp_path, clock):
+    limiter = _limiter(tmp_path)
+    assert limiter.has_spare_budget("gnews", 0.5)
+    for _ in range(3):
+        limiter.try_acquire("gnews")
+    # 2 of 5 left: one more call would dip under half the daily quota
+    assert not limiter.has_spare_budget("gnews", 0.5)
+    assert limiter.has_budget("gnews")
+    assert limiter.has_spare_budget("unknown", 0.5)